@@ -1,18 +1,45 @@
 # app/main.py
 import asyncio
 import contextlib
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from typing import Literal, Optional
 
+import numpy as np
+import orjson
+import pydantic_core
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
+from pydantic import BaseModel
 
-from .models import ClientMsg, Drone, ErrorMsg, MetaMsg, StateMsg, World
+from .models import ClientMsg, Drone, ErrorMsg, MetaMsg, World
+from .sim.algorithms.registry import warm_up
 from .sim.engine import SimulationEngine
-from .sim.osm_world import (world_from_osm_bbox_fast_centers,
+from .sim.osm_world import (world_from_osm_bbox_fast_centers_async,
                             world_synthetic_city)
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up_planners() -> None:
+    try:
+        await asyncio.to_thread(warm_up)
+    except Exception:
+        logger.exception("planner warm-up failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # JIT-compile planner kernels off the event loop while the server starts taking requests
+    warm_task = asyncio.create_task(_warm_up_planners())
+    yield
+    warm_task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173", "*"],
@@ -20,6 +47,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# worlds are a few hundred KB of JSON and compress ~5x
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 class BBoxBody(BaseModel):
@@ -36,30 +65,60 @@ class BBoxBody(BaseModel):
     city_h: float = 4000.0
     seed: Optional[int] = None
 
+
+# (rounded bbox, target_buildings) -> (obstacle count, JSON body), most recent last
+_OSM_WORLDS: OrderedDict[tuple, tuple[int, bytes]] = OrderedDict()
+_OSM_WORLDS_MAX = 64
+
+
+async def _osm_world_json(north: float, south: float, east: float, west: float,
+                          target_buildings: Optional[int]) -> tuple[int, bytes]:
+    """Overpass fetch + synthesis, memoised per (rounded) bbox as (obstacle count, JSON body)."""
+    key = (north, south, east, west, target_buildings)
+    hit = _OSM_WORLDS.get(key)
+    if hit is not None:
+        _OSM_WORLDS.move_to_end(key)
+        return hit
+    w = await world_from_osm_bbox_fast_centers_async(
+        (north, south, east, west),
+        target_buildings=target_buildings
+    )
+    hit = (len(w.obstacles), await asyncio.to_thread(pydantic_core.to_json, w))
+    if not hit[0]:
+        return hit  # an empty result may be transient; let the next request retry
+    _OSM_WORLDS[key] = hit
+    if len(_OSM_WORLDS) > _OSM_WORLDS_MAX:
+        _OSM_WORLDS.popitem(last=False)
+    return hit
+
+
+def _synthetic_world_json(body: BBoxBody) -> tuple[int, bytes]:
+    w = world_synthetic_city(
+        city_w=body.city_w,
+        city_h=body.city_h,
+        seed=body.seed,
+    )
+    return len(w.obstacles), pydantic_core.to_json(w)
+
+
 @app.post("/world_from_osm")
-def make_world(body: BBoxBody):
+async def make_world(body: BBoxBody):
     try:
         if body.mode == "synthetic":
-            w = world_synthetic_city(
-                city_w=body.city_w,
-                city_h=body.city_h,
-                seed=body.seed,
-            )
+            n_obstacles, payload = await asyncio.to_thread(_synthetic_world_json, body)
         else:
             if None in (body.north, body.south, body.east, body.west):
                 raise HTTPException(status_code=400, detail="OSM mode requires north/south/east/west.")
-            north = float(body.north) if body.north is not None else 0.0
-            south = float(body.south) if body.south is not None else 0.0
-            east = float(body.east) if body.east is not None else 0.0
-            west = float(body.west) if body.west is not None else 0.0
-            w = world_from_osm_bbox_fast_centers(
-                (north, south, east, west),
-                target_buildings=body.target_buildings
+            # ~1 m of rounding so small map nudges reuse the previous Overpass result
+            n_obstacles, payload = await _osm_world_json(
+                round(body.north, 5), round(body.south, 5), round(body.east, 5), round(body.west, 5),
+                body.target_buildings,
             )
 
-        if len(w.obstacles) == 0:
+        if n_obstacles == 0:
             raise HTTPException(status_code=400, detail="No buildings produced; adjust parameters.")
-        return w.model_dump()
+        # already-serialized JSON: skip FastAPI's jsonable_encoder walk over every building
+        return Response(content=payload, media_type="application/json")
 
     except HTTPException:
         raise
@@ -67,7 +126,47 @@ def make_world(body: BBoxBody):
         raise HTTPException(status_code=500, detail=f"/world_from_osm failed: {e}")
 
 
-# ---------- algorithms + websocket (unchanged) ----------
+def _enc(msg: BaseModel | dict) -> bytes:
+    """Encode an outbound message as a binary (UTF-8 JSON) websocket frame."""
+    if isinstance(msg, BaseModel):
+        return pydantic_core.to_json(msg)  # one pass in pydantic-core, no intermediate dict
+    return orjson.dumps(msg, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _state_frame(tick: int, drones: list[Drone], world: World) -> dict:
+    """Drone state with pos/vel quantized to int16 steps of max(world.size)/32767 (flat x,y,z per drone)."""
+    scale = max(max(world.size), 1e-6) / 32767.0  # a zero-size world must not divide by zero
+    xyz = np.array([(d.pos.x, d.pos.y, d.pos.z, d.vel.x, d.vel.y, d.vel.z) for d in drones],
+                   dtype=np.float32).reshape(-1, 6)
+    q = np.clip(np.rint(xyz / scale), -32767, 32767).astype(np.int16)
+    return {"type": "state", "tick": tick, "scale": scale, "ids": [d.id for d in drones],
+            "pos": q[:, :3].ravel(), "vel": q[:, 3:].ravel()}
+
+
+async def drain_states(ws: WebSocket, out_q: "asyncio.Queue[dict]") -> None:
+    """Send state frames as the socket keeps up; ``out_q`` holds at most the newest one."""
+    while True:
+        await ws.send_bytes(_enc(await out_q.get()))
+
+
+def _offer_latest(out_q: "asyncio.Queue[dict]", frame: dict) -> None:
+    """Queue ``frame`` for sending, replacing any frame the sender hasn't picked up yet."""
+    with contextlib.suppress(asyncio.QueueEmpty):
+        out_q.get_nowait()
+    out_q.put_nowait(frame)
+
+
+_CONTROL_TYPES = frozenset({"start", "pause", "reset"})
+
+
+def _is_control(kind, raw) -> bool:
+    """True for messages the websocket loop can act on without building a ClientMsg."""
+    if kind in _CONTROL_TYPES:
+        return True
+    # anything but a plain int rate goes through pydantic for coercion / errors
+    return kind == "tick_rate" and type(raw.get("tick_rate_hz")) is int
+
+
 @app.get("/algorithms")
 def get_algorithms():
     world = World()
@@ -80,63 +179,83 @@ async def ws_endpoint(ws: WebSocket):
     world = World()
     engine = SimulationEngine(world=world)
     tick_task: asyncio.Task | None = None
+    # one slot: a slow socket skips stale frames instead of sending a growing backlog
+    out_q: asyncio.Queue[dict] = asyncio.Queue(maxsize=1)
+
+    await ws.send_bytes(_enc(MetaMsg(algorithms=engine.algorithms(), world=world, worlds=[])))
+    sender_task = asyncio.create_task(drain_states(ws, out_q))
+
+    def on_sender_done(task: asyncio.Task) -> None:
+        # a dead sender means nobody drains out_q; stop the simulation feeding it
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("state sender stopped: %r", task.exception())
+        if tick_task and not tick_task.done():
+            tick_task.cancel()
 
-    await ws.send_json(MetaMsg(algorithms=engine.algorithms(), world=world, worlds=[]).model_dump())
+    sender_task.add_done_callback(on_sender_done)
 
     async def send_state(tick: int, drones: list[Drone]):
-        await ws.send_json(StateMsg(tick=tick, drones=drones).model_dump())
+        # snapshot now: drones keep moving while the frame waits in the queue
+        _offer_latest(out_q, _state_frame(tick, drones, engine.world))
 
     try:
         while True:
-            raw = await ws.receive_json()
+            text = await ws.receive_text()
             try:
-                msg = ClientMsg(**raw)
+                raw = orjson.loads(text)
+                kind = raw.get("type") if isinstance(raw, dict) else None
+                # control messages carry nothing but a type (and a rate); skip pydantic for them
+                if _is_control(kind, raw):
+                    msg = None
+                else:
+                    msg = ClientMsg.model_validate(raw)
+                    kind = msg.type
             except Exception as e:
-                await ws.send_json(ErrorMsg(message=f"bad message: {e}").model_dump())
+                await ws.send_bytes(_enc(ErrorMsg(message=f"bad message: {e}")))
                 continue
 
-            if msg.type == "set_world" and msg.world is not None:
-                engine.world = msg.world
+            if kind == "set_world" and msg.world is not None:
+                engine.set_world(msg.world)
                 engine.tick = 0
-                await ws.send_json(MetaMsg(algorithms=engine.algorithms(), world=engine.world, worlds=[]).model_dump())
+                await ws.send_bytes(_enc(MetaMsg(algorithms=engine.algorithms(), world=engine.world, worlds=[])))
 
-            elif msg.type == "init" and msg.world is not None:
-                engine.world = msg.world
+            elif kind == "init" and msg.world is not None:
+                engine.set_world(msg.world)
 
-            elif msg.type == "set_algorithm" and msg.algorithm:
+            elif kind == "set_algorithm" and msg.algorithm:
                 try:
-                    print(f"Setting algorithm to: {msg.algorithm}")
                     engine.set_algorithm(msg.algorithm)
-                    print(f"Algorithm set successfully. Available algorithms: {engine.algorithms()}")
+                    logger.debug("algorithm set to %s", msg.algorithm)
                 except KeyError as e:
-                    print(f"Error setting algorithm: {e}")
-                    await ws.send_json(ErrorMsg(message=str(e)).model_dump())
+                    logger.debug("unknown algorithm %r: %s", msg.algorithm, e)
+                    await ws.send_bytes(_enc(ErrorMsg(message=str(e))))
 
-            elif msg.type == "set_params" and msg.params is not None:
+            elif kind == "set_params" and msg.params is not None:
                 engine.set_params(msg.params)
 
-            elif msg.type == "set_drones" and msg.drones is not None:
-                print(f"Setting {len(msg.drones)} drones")
+            elif kind == "set_drones" and msg.drones is not None:
                 engine.set_drones(msg.drones)
-                print(f"Current algorithm: {type(engine.algorithm).__name__}")
-                print(f"Current drones: {len(engine.drones)}")
+                logger.debug("set %d drones (algorithm %s)", len(engine.drones), engine.algorithm.name)
 
-            elif msg.type == "tick_rate" and msg.tick_rate_hz:
-                engine.tick_rate_hz = msg.tick_rate_hz
+            elif kind == "tick_rate":
+                hz = raw["tick_rate_hz"] if msg is None else msg.tick_rate_hz
+                if hz:
+                    engine.tick_rate_hz = hz
 
-            elif msg.type == "start":
-                print(f"Starting simulation with {len(engine.drones)} drones and algorithm: {type(engine.algorithm).__name__}")
-                if not tick_task or tick_task.done():
+            elif kind == "start":
+                logger.debug("starting simulation: %d drones, algorithm %s",
+                             len(engine.drones), engine.algorithm.name)
+                if (not tick_task or tick_task.done()) and not sender_task.done():
                     tick_task = asyncio.create_task(engine.run(send_state))
 
-            elif msg.type == "pause":
+            elif kind == "pause":
                 if tick_task and not tick_task.done():
                     tick_task.cancel()
                     with contextlib.suppress(Exception):
                         await tick_task
                 tick_task = None
 
-            elif msg.type == "reset":
+            elif kind == "reset":
                 engine.tick = 0
                 engine.drones = []
                 engine.params = {}
@@ -145,10 +264,15 @@ async def ws_endpoint(ws: WebSocket):
                     with contextlib.suppress(Exception):
                         await tick_task
                 tick_task = None
-                await ws.send_json(MetaMsg(algorithms=engine.algorithms(), world=engine.world, worlds=[]).model_dump())
+                await ws.send_bytes(_enc(MetaMsg(algorithms=engine.algorithms(), world=engine.world, worlds=[])))
 
     except WebSocketDisconnect:
+        pass
+    finally:
         if tick_task and not tick_task.done():
             tick_task.cancel()
-            with contextlib.suppress(Exception):
+            with contextlib.suppress(asyncio.CancelledError, Exception):
                 await tick_task
+        sender_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await sender_task
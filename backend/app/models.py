@@ -1,27 +1,92 @@
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Literal, Optional, Tuple
 
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, PrivateAttr, model_validator
 
 
-class Vec3(BaseModel):
+# Vec3/Drone are touched every tick and Buildings come by the thousand, so they
+# are slotted dataclasses rather than pydantic models; pydantic still validates
+# them inside ClientMsg / World.
+@dataclass(slots=True)
+class Vec3:
     x: float
     y: float
     z: float = 0.0
 
-class Building(BaseModel):
+@dataclass(slots=True)
+class Building:
     id: str
-    center: Vec3              
-    size: Vec3                 
+    center: Vec3
+    size: Vec3
+
+@dataclass(slots=True)
+class BuildingSoA:
+    """Obstacles as parallel arrays, as world generators produce them.
+
+    ``centers`` and ``sizes`` are (N, 3) float32 rows of x, y, z. World.from_soa
+    adopts the arrays directly and builds the Building list once.
+    """
+    ids: List[str]
+    centers: np.ndarray
+    sizes: np.ndarray
+
+    def to_buildings(self) -> List[Building]:
+        return [Building(i, Vec3(*c), Vec3(*sz))
+                for i, c, sz in zip(self.ids, self.centers.tolist(), self.sizes.tolist())]
+
 
 class World(BaseModel):
     size: Tuple[float, float, float] = (1000.0, 1000.0, 150.0)
     obstacles: List[Building] = []
+    # SoA copies of obstacle centers/sizes for numpy hot paths; filled once at
+    # validation, so mutate obstacles by building a new World, not in place.
+    _centers: np.ndarray = PrivateAttr(default_factory=lambda: np.zeros((0, 3), dtype=np.float32))
+    _sizes: np.ndarray = PrivateAttr(default_factory=lambda: np.zeros((0, 3), dtype=np.float32))
+    # bumped by the engine whenever the world is swapped; private so clients can't set it
+    _version: int = PrivateAttr(default=0)
+
+    @model_validator(mode="after")
+    def _pack_obstacles(self) -> "World":
+        obs = self.obstacles
+        self._centers = np.array([(b.center.x, b.center.y, b.center.z) for b in obs], dtype=np.float32).reshape(-1, 3)
+        self._sizes = np.array([(b.size.x, b.size.y, b.size.z) for b in obs], dtype=np.float32).reshape(-1, 3)
+        return self
+
+    @classmethod
+    def from_soa(cls, size: Tuple[float, float, float], soa: BuildingSoA) -> "World":
+        """World over generator-built obstacles, adopting the SoA arrays as-is.
 
-class Drone(BaseModel):
+        Skips per-Building validation and the obstacle repack; the arrays must
+        not be mutated afterwards.
+        """
+        w = cls.model_construct(size=tuple(float(v) for v in size), obstacles=soa.to_buildings())
+        w._centers = np.asarray(soa.centers, dtype=np.float32).reshape(-1, 3)
+        w._sizes = np.asarray(soa.sizes, dtype=np.float32).reshape(-1, 3)
+        return w
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _bump_version(self, prev: int) -> None:
+        """Mark this world as newer than one at version ``prev`` (engine use only)."""
+        self._version = prev + 1
+
+    @property
+    def obs_centers(self) -> np.ndarray:
+        return self._centers
+
+    @property
+    def obs_sizes(self) -> np.ndarray:
+        return self._sizes
+
+@dataclass(slots=True)
+class Drone:
     id: str
     pos: Vec3
-    vel: Vec3 = Vec3(x=0, y=0, z=0)
-    path: List[Vec3] = []
+    vel: Vec3 = field(default_factory=lambda: Vec3(x=0, y=0, z=0))
+    path: List[Vec3] = field(default_factory=list)
     target: Optional[Vec3] = None
 
 class ClientMsg(BaseModel):
@@ -36,12 +101,6 @@ class ClientMsg(BaseModel):
     world: Optional[World] = None
     tick_rate_hz: Optional[int] = None
 
-class StateMsg(BaseModel):
-    type: Literal["state"] = "state"
-    tick: int
-    drones: List[Drone]
-    done: bool = False
-
 class MetaMsg(BaseModel):
     type: Literal["meta"] = "meta"
     algorithms: List[str]
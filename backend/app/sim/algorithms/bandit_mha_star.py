@@ -2,21 +2,115 @@ from __future__ import annotations
 
 import heapq
 import math
+from collections import OrderedDict
 from dataclasses import dataclass
+from itertools import repeat
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+from scipy.ndimage import distance_transform_edt
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import dijkstra
+
 from ...models import Drone, Vec3, World
-from .base import AlgoContext, Algorithm
+from ..jit import njit
+from .base import AlgoContext, Algorithm, ReplanSchedule
 
 Coord = Tuple[int, int]
 
+# neighbour offsets and step lengths (cells); the first 4 rows are the 4-connected moves
+_NBR_DXY = np.array([(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1)], dtype=np.int64)
+_NBR_STEP = np.array([1.0, 1.0, 1.0, 1.0] + [math.sqrt(2.0)] * 4)
+
 
-def _rect_overlaps_cell(cx, cy, w, d, cell_x, cell_y, cell_size):
-    rx0, rx1 = cx - w * 0.5, cx + w * 0.5
-    ry0, ry1 = cy - d * 0.5, cy + d * 0.5
-    cx0, cx1 = cell_x * cell_size, (cell_x + 1) * cell_size
-    cy0, cy1 = cell_y * cell_size, (cell_y + 1) * cell_size
-    return not (rx1 <= cx0 or rx0 >= cx1 or ry1 <= cy0 or ry0 >= cy1)
+def _footprint_cells(centers, sizes, inflate, cell_size, w_cells, h_cells):
+    """Inclusive cell bounds (x0, x1, y0, y1) of every obstacle footprint grown by ``inflate``.
+
+    Bounds come straight from floor/ceil of the footprint edges, so a cell is covered
+    exactly when the footprint overlaps it with positive area. Footprints that miss
+    the grid come back with x0 > x1 or y0 > y1.
+    """
+    c = centers[:, :2].astype(np.float64)
+    half = sizes[:, :2].astype(np.float64) * 0.5 + inflate
+    lo = np.floor((c - half) / cell_size)
+    hi = np.ceil((c + half) / cell_size) - 1
+    x0 = np.maximum(lo[:, 0], 0).astype(np.int64)
+    y0 = np.maximum(lo[:, 1], 0).astype(np.int64)
+    x1 = np.minimum(hi[:, 0], w_cells - 1).astype(np.int64)
+    y1 = np.minimum(hi[:, 1], h_cells - 1).astype(np.int64)
+    return x0, x1, y0, y1
+
+
+@njit(cache=True)
+def _rasterize(x0, x1, y0, y1, w_cells, h_cells):
+    """Stamp inclusive cell rectangles into an (h, w) occupancy grid, one slice fill each."""
+    blocked = np.zeros((h_cells, w_cells), dtype=np.uint8)
+    for i in range(x0.shape[0]):
+        if x0[i] <= x1[i] and y0[i] <= y1[i]:
+            blocked[y0[i]:y1[i] + 1, x0[i]:x1[i] + 1] = 1
+    return blocked
+
+
+def _clearance(blocked: np.ndarray, cell_size: float) -> np.ndarray:
+    """Flat Euclidean distance (meters) from every cell to the nearest blocked cell."""
+    if not blocked.any():
+        # nothing to be near: effectively unbounded clearance everywhere
+        return np.full(blocked.size, 1e9 * cell_size)
+    return distance_transform_edt(blocked == 0).ravel() * cell_size
+
+
+def _nearest_free_table(blocked: np.ndarray) -> Optional[np.ndarray]:
+    """(2, h, w) row/col of the closest free cell for every cell; None if nothing is free."""
+    if blocked.all():
+        return None
+    return distance_transform_edt(blocked, return_distances=False, return_indices=True)
+
+
+def _free_space_graph(blocked: np.ndarray, cell_size: float):
+    """Undirected 8-connected graph over free cells, edge weights in meters."""
+    h_cells, w_cells = blocked.shape
+    idx = np.arange(blocked.size).reshape(h_cells, w_cells)
+    free = blocked == 0
+    src, dst, wgt = [], [], []
+    # each undirected edge once: right, down, down-right, down-left
+    for dx, dy, step in ((1, 0, 1.0), (0, 1, 1.0), (1, 1, math.sqrt(2.0)), (-1, 1, math.sqrt(2.0))):
+        ys = slice(0, h_cells - dy)
+        xs = slice(max(0, -dx), w_cells - max(0, dx))
+        yt = slice(dy, h_cells)
+        xt = slice(max(0, dx), w_cells - max(0, -dx))
+        ok = free[ys, xs] & free[yt, xt]
+        src.append(idx[ys, xs][ok])
+        dst.append(idx[yt, xt][ok])
+        wgt.append(np.full(int(ok.sum()), step * cell_size))
+    n = blocked.size
+    return coo_matrix((np.concatenate(wgt), (np.concatenate(src), np.concatenate(dst))), shape=(n, n)).tocsr()
+
+
+def _landmark_table(blocked: np.ndarray, cell_size: float, k: int) -> np.ndarray:
+    """(k, h*w) float32 shortest-path distances (meters) from k landmarks; -1 = unreachable.
+
+    Landmarks are chosen by farthest-point sampling over the free space: each new
+    landmark is the reachable cell farthest from all landmarks picked so far.
+    """
+    free = np.flatnonzero(blocked.ravel() == 0)
+    if free.size == 0:
+        return np.full((0, blocked.size), -1.0, dtype=np.float32)
+    graph = _free_space_graph(blocked, cell_size)
+    seed = dijkstra(graph, directed=False, indices=int(free[0]))
+    nxt = int(np.argmax(np.where(np.isfinite(seed), seed, -1.0)))
+    nearest = np.full(blocked.size, np.inf)
+    rows = []
+    for _ in range(k):
+        d = dijkstra(graph, directed=False, indices=nxt)
+        rows.append(d)
+        nearest = np.minimum(nearest, d)
+        reach = np.isfinite(nearest)
+        nxt = int(np.argmax(np.where(reach, nearest, -1.0)))
+        if nearest[nxt] <= 0.0:
+            break  # every reachable cell is already a landmark
+    table = np.stack(rows)
+    return np.where(np.isfinite(table), table, -1.0).astype(np.float32)
 
 
 @dataclass
@@ -25,92 +119,92 @@ class GridCacheBMHA:
     cell: float
     w: int
     h: int
-    blocked: List[bool]
-    clearance_m: List[float]
+    blocked: np.ndarray       # (h, w) uint8
+    clearance_m: np.ndarray   # (h * w,) float32, meters
+    # (2, h, w): row/col of the nearest free cell for every cell; None when none is free
+    nearest_free_idx: Optional[np.ndarray] = None
+    # (K, h * w) float32 landmark distances in meters (-1 unreachable); None when K = 0
+    landmark_dist: Optional[np.ndarray] = None
 
     @staticmethod
-    def build(world: World, cell_size: float, clearance_inflate_m: float) -> "GridCacheBMHA":
+    def build(world: World, cell_size: float, clearance_inflate_m: float,
+              n_landmarks: int = 0) -> "GridCacheBMHA":
         w_cells = max(1, int(world.size[0] // cell_size))
         h_cells = max(1, int(world.size[1] // cell_size))
-        N = w_cells * h_cells
-
-        blocked = [False] * N
-        for b in world.obstacles:
-            cx, cy = b.center.x, b.center.y
-            w, d = b.size.x + 2 * clearance_inflate_m, b.size.y + 2 * clearance_inflate_m
-            xmin = max(0, int((cx - w * 0.5) // cell_size))
-            xmax = min(w_cells - 1, int((cx + w * 0.5) // cell_size))
-            ymin = max(0, int((cy - d * 0.5) // cell_size))
-            ymax = min(h_cells - 1, int((cy + d * 0.5) // cell_size))
-            for gx in range(xmin, xmax + 1):
-                for gy in range(ymin, ymax + 1):
-                    if _rect_overlaps_cell(cx, cy, w, d, gx, gy, cell_size):
-                        blocked[gy * w_cells + gx] = True
-
-        INF = 10**9
-        dist = [0 if blocked[i] else INF for i in range(N)]
-
-        for y in range(h_cells):
-            row = y * w_cells
-            for x in range(w_cells):
-                i = row + x
-                if dist[i] == 0:
-                    continue
-                best = dist[i]
-                if x > 0:
-                    best = min(best, dist[i - 1] + 1)
-                if y > 0:
-                    best = min(best, dist[i - w_cells] + 1)
-                dist[i] = best
-
-        for y in range(h_cells - 1, -1, -1):
-            row = y * w_cells
-            for x in range(w_cells - 1, -1, -1):
-                i = row + x
-                if dist[i] == 0:
-                    continue
-                best = dist[i]
-                if x + 1 < w_cells:
-                    best = min(best, dist[i + 1] + 1)
-                if y + 1 < h_cells:
-                    best = min(best, dist[i + w_cells] + 1)
-                dist[i] = best
-
-        clearance_m = [d * cell_size for d in dist]
+        x0, x1, y0, y1 = _footprint_cells(world.obs_centers, world.obs_sizes,
+                                          float(clearance_inflate_m), float(cell_size), w_cells, h_cells)
+        blocked = _rasterize(x0, x1, y0, y1, w_cells, h_cells)
+        clearance_m = _clearance(blocked, float(cell_size)).astype(np.float32)
         return GridCacheBMHA(cell=cell_size, w=w_cells, h=h_cells,
-                             blocked=blocked, clearance_m=clearance_m)
+                             blocked=blocked, clearance_m=clearance_m,
+                             nearest_free_idx=_nearest_free_table(blocked),
+                             landmark_dist=_landmark_table(blocked, float(cell_size), n_landmarks)
+                             if n_landmarks > 0 else None)
 
     @staticmethod
-    def build_fallback(world: World, cell_size: float, clearance_inflate_m: float) -> "GridCacheBMHA":
+    def build_fallback(world: World, cell_size: float, clearance_inflate_m: float,
+                       n_landmarks: int = 0) -> "GridCacheBMHA":
         w_cells = max(1, int(world.size[0] // cell_size))
         h_cells = max(1, int(world.size[1] // cell_size))
         N = w_cells * h_cells
-        blocked = [False] * N
+        blocked = np.zeros((h_cells, w_cells), dtype=np.uint8)
         for b in world.obstacles:
             gx = max(0, min(w_cells - 1, int(b.center.x // cell_size)))
             gy = max(0, min(h_cells - 1, int(b.center.y // cell_size)))
-            blocked[gy * w_cells + gx] = True
-        clearance_m = [cell_size * 2.0] * N
+            blocked[gy, gx] = 1
+        clearance_m = np.full(N, cell_size * 2.0, dtype=np.float32)
         return GridCacheBMHA(cell=cell_size, w=w_cells, h=h_cells,
-                             blocked=blocked, clearance_m=clearance_m)
+                             blocked=blocked, clearance_m=clearance_m,
+                             nearest_free_idx=_nearest_free_table(blocked),
+                             landmark_dist=_landmark_table(blocked, float(cell_size), n_landmarks)
+                             if n_landmarks > 0 else None)
+
+    @staticmethod
+    def for_world(world: World, cell: float, inflate: float, n_landmarks: int = 0) -> "GridCacheBMHA":
+        """Planner grid for ``world``: coarsened for very large maps, point fallback if the raster fails."""
+        w_cells = max(1, int(world.size[0] // max(cell, 1.0)))
+        h_cells = max(1, int(world.size[1] // max(cell, 1.0)))
+        if w_cells * h_cells > 300_000 or len(world.obstacles) > 5000:
+            coarse = max(cell, 24.0)
+            try:
+                return GridCacheBMHA.build(world, coarse, inflate, n_landmarks)
+            except Exception:
+                return GridCacheBMHA.build_fallback(world, coarse, inflate, n_landmarks)
+        return GridCacheBMHA.build(world, cell, inflate, n_landmarks)
 
     def idx(self, g: Coord) -> int:
         return g[1] * self.w + g[0]
 
     def is_blocked(self, g: Coord) -> bool:
         x, y = g
-        return x < 0 or y < 0 or x >= self.w or y >= self.h or self.blocked[self.idx(g)]
+        return x < 0 or y < 0 or x >= self.w or y >= self.h or self.blocked[y, x]
 
     def to_world(self, g: Coord, z: float) -> Vec3:
         return Vec3(x=(g[0] + 0.5) * self.cell, y=(g[1] + 0.5) * self.cell, z=z)
 
+    def path_to_world(self, chain, z: float) -> List[Vec3]:
+        """Waypoints at the centers of the flat cell indices in ``chain``."""
+        chain = np.asarray(chain, dtype=np.int64)
+        xs = (chain % self.w + 0.5) * self.cell
+        ys = (chain // self.w + 0.5) * self.cell
+        return list(map(Vec3, xs.tolist(), ys.tolist(), repeat(z, len(chain))))
+
     def from_world(self, x: float, y: float) -> Coord:
         return (
             max(0, min(self.w - 1, int(x // self.cell))),
             max(0, min(self.h - 1, int(y // self.cell))),
         )
 
+    def nearest_free(self, g0: Coord) -> Coord:
+        if not self.is_blocked(g0):
+            return g0
+        x, y = g0
+        if self.nearest_free_idx is None or not (0 <= x < self.w and 0 <= y < self.h):
+            return g0
+        return (int(self.nearest_free_idx[1, y, x]), int(self.nearest_free_idx[0, y, x]))
+
 
+@njit(cache=True)
 def _speed_from_clearance(clr_m: float, v_min: float, v_max: float, kappa_m: float) -> float:
     """Monotone increasing speed model: v = v_min + (v_max - v_min) * clr/(clr+kappa)."""
     if kappa_m <= 0:
@@ -119,6 +213,289 @@ def _speed_from_clearance(clr_m: float, v_min: float, v_max: float, kappa_m: flo
     return max(v_min, min(v_max, v_min + (v_max - v_min) * frac))
 
 
+def _speed_table(clearance_m: np.ndarray, v_min: float, v_max: float, kappa_m: float) -> np.ndarray:
+    """``_speed_from_clearance`` evaluated for every cell at once."""
+    if kappa_m <= 0:
+        return np.full(clearance_m.shape, v_max)
+    c = clearance_m.astype(np.float64)
+    return np.maximum(v_min, np.minimum(v_max, v_min + (v_max - v_min) * (c / (c + kappa_m))))
+
+
+@njit(cache=True)
+def _h_euclid_time(x, y, tx, ty, cell, v_max):
+    return (math.hypot(float(x - tx), float(y - ty)) * cell) / max(1e-6, v_max)
+
+
+@njit(cache=True)
+def _bearing_alignment(g1x, g1y, n1, tx, ty, nx, ny):
+    """Cosine between the start->goal vector (g1, norm n1, fixed per plan) and n->goal."""
+    g2x, g2y = tx - nx, ty - ny
+    n2 = math.hypot(float(g2x), float(g2y)) + 1e-9
+    return max(-1.0, min(1.0, (g1x * g2x + g1y * g2y) / (n1 * n2)))
+
+
+@njit(cache=True)
+def _f_queue(q, n, g_n, W, cell, v_cell, g1x, g1y, n1, tx, ty, lm_dist, lm_goal,
+             v_max, w_clear, w_landm, w_bear, gamma_bear):
+    """Priority of cell ``n`` in queue ``q`` (0 anchor, 1 clearance, 2 landmark, 3 bearing)."""
+    x, y = n % W, n // W
+    if q == 0:
+        return g_n + _h_euclid_time(x, y, tx, ty, cell, v_max)
+    if q == 1:
+        v_est = v_cell[n]
+        return g_n + w_clear * ((math.hypot(float(x - tx), float(y - ty)) * cell) / max(1e-6, v_est))
+    if q == 2:
+        best = 0.0
+        for k in range(lm_dist.shape[0]):
+            d_n = lm_dist[k, n]
+            if d_n < 0.0 or lm_goal[k] < 0.0:
+                continue  # not connected to this landmark: no bound from it
+            best = max(best, abs(d_n - lm_goal[k]))
+        return g_n + w_landm * (best / max(1e-6, v_max))
+    h = _h_euclid_time(x, y, tx, ty, cell, v_max)
+    align = _bearing_alignment(g1x, g1y, n1, tx, ty, x, y)
+    return g_n + w_bear * max(0.0, h * (1.0 - gamma_bear * align))
+
+
+@njit(cache=True)
+def _choose_queue_ucb(force_anchor, avail, pulls, reward_sum, total_pulls, c):
+    """UCB1 over the non-empty queues; untried queues first, anchor when forced."""
+    if force_anchor and avail[0]:
+        return 0
+    first = -1
+    for i in range(4):
+        if avail[i]:
+            if first < 0:
+                first = i
+            if pulls[i] == 0:
+                return i
+    if first < 0:
+        return 0
+    best_i = first
+    best_score = -1e18
+    for i in range(4):
+        if not avail[i]:
+            continue
+        avg = reward_sum[i] / max(1, pulls[i])
+        score = avg + c * math.sqrt(math.log(max(1, total_pulls)) / pulls[i])
+        if score > best_score:
+            best_score = score
+            best_i = i
+    return best_i
+
+
+@njit(cache=True)
+def _edge_time(v_cell, W, H, u, ux, uy, v, vx, vy, length, samples, v_oob):
+    """Travel time of the grid edge u -> v (``length`` meters)."""
+    if samples <= 2:
+        v_eff = min(v_cell[u], v_cell[v])
+    else:
+        # speed is monotone in clearance: slowest sample == speed at least clearance
+        v_eff = np.inf
+        for j in range(samples):
+            f = j / (samples - 1)
+            px = int(round(ux + f * (vx - ux)))
+            py = int(round(uy + f * (vy - uy)))
+            if px < 0 or py < 0 or px >= W or py >= H:
+                v_eff = v_oob
+                break
+            v_eff = min(v_eff, v_cell[py * W + px])
+    return length / max(1e-6, v_eff)
+
+
+@njit(cache=True)
+def _astar_core(blocked, v_cell, W, H, cell, s, t, lm_dist, lm_goal, n_nbrs, samples,
+                v_max, v_min, clr_k, w_clear, w_landm, w_bear, gamma_bear,
+                ucb_c, anchor_period, max_exp, subopt_w, push_all):
+    """Bandit-scheduled multi-queue search from flat cell ``s`` to ``t``.
+
+    Cells relaxed by an anchor expansion are pushed to every queue, so the hint
+    arms always share the anchor's frontier; cells relaxed by a hint arm go only
+    to the anchor and to that arm (to all four when ``push_all``). The anchor
+    keeps the full admissible frontier either way.
+
+    Returns (parent, reached, pulls): flat predecessor index per cell (-1 if never
+    relaxed), whether the goal was popped before the expansion budget ran out,
+    and how many cells each queue expanded.
+    """
+    N = W * H
+    g = np.full(N, np.inf)
+    parent = np.full(N, -1, dtype=np.int32)
+    closed = np.zeros(N, dtype=np.uint8)
+    sx, sy = s % W, s // W
+    tx, ty = t % W, t // W
+    g1x, g1y = tx - sx, ty - sy
+    n1 = math.hypot(float(g1x), float(g1y)) + 1e-9
+    nbr_off = _NBR_DXY[:, 1] * W + _NBR_DXY[:, 0]
+    nbr_len = _NBR_STEP * cell
+    v_oob = _speed_from_clearance(0.0, v_min, v_max, clr_k)
+    # without landmarks queue 2 would just be Dijkstra on g; leave it empty so UCB never picks it
+    skip_q = 2 if lm_dist.shape[0] == 0 else -1
+
+    # one heap per queue of (key, flat cell); equal keys pop lowest cell first
+    heaps = [[(0.0, 0)] for _ in range(4)]
+    for q in range(4):
+        heaps[q].pop()
+    g[s] = 0.0
+    for q in range(4):
+        if q == skip_q:
+            continue
+        heapq.heappush(heaps[q], (_f_queue(q, s, 0.0, W, cell, v_cell, g1x, g1y, n1, tx, ty, lm_dist, lm_goal,
+                                           v_max, w_clear, w_landm, w_bear, gamma_bear), s))
+
+    pulls = np.zeros(4, dtype=np.int64)
+    reward_sum = np.zeros(4)
+    avail = np.zeros(4, dtype=np.uint8)
+    total_pulls = 0
+    h_start = _h_euclid_time(sx, sy, tx, ty, cell, v_max)
+    last_progress = h_start
+    reached = False
+    expansions = 0
+
+    while expansions < max_exp:
+        expansions += 1
+        forced_anchor = expansions % anchor_period == 0
+
+        # pop the first entry that is still open; an arm that drains falls back to
+        # the others, the search ends when all are empty. Keys need no re-check: a
+        # cell's h is fixed per queue and g only decreases, so the key at pop time
+        # is never above the pushed one.
+        u = -1
+        q_idx = 0
+        while True:
+            for q in range(4):
+                avail[q] = len(heaps[q]) > 0
+            if not avail.any():
+                break
+            q_idx = _choose_queue_ucb(forced_anchor, avail, pulls, reward_sum, total_pulls, ucb_c)
+            heap = heaps[q_idx]
+            while len(heap) > 0:
+                n = heapq.heappop(heap)[1]
+                if closed[n]:
+                    continue
+                u = n
+                break
+            if u >= 0:
+                break
+        if u < 0:
+            break
+
+        if u == t:
+            reached = True
+            if q_idx == 0:
+                break
+            if g[u] <= subopt_w * h_start:
+                break
+
+        closed[u] = 1
+        pulls[q_idx] += 1
+        total_pulls += 1
+
+        ux, uy = u % W, u // W
+        for k in range(n_nbrs):
+            vx = ux + _NBR_DXY[k, 0]
+            vy = uy + _NBR_DXY[k, 1]
+            if vx < 0 or vy < 0 or vx >= W or vy >= H:
+                continue
+            v = u + nbr_off[k]
+            if blocked[v]:
+                continue
+            cand = g[u] + _edge_time(v_cell, W, H, u, ux, uy, v, vx, vy, nbr_len[k], samples, v_oob)
+            if cand + 1e-12 < g[v]:
+                g[v] = cand
+                parent[v] = u
+                share = push_all or q_idx == 0
+                for q in range(4):
+                    if q == skip_q or (not share and q != 0 and q != q_idx):
+                        continue
+                    heapq.heappush(heaps[q], (_f_queue(q, v, cand, W, cell, v_cell, g1x, g1y, n1, tx, ty,
+                                                       lm_dist, lm_goal, v_max,
+                                                       w_clear, w_landm, w_bear, gamma_bear), v))
+
+        # bandit reward: progress of the expanded node toward the goal
+        cur_h = _h_euclid_time(ux, uy, tx, ty, cell, v_max)
+        reward_sum[q_idx] += max(0.0, last_progress - cur_h)
+        last_progress = cur_h
+
+    return parent, reached, pulls
+
+
+@njit(cache=True)
+def _time_to_goal(blocked, v_cell, W, H, cell, t, sources, n_nbrs, samples, v_oob):
+    """Reverse Dijkstra: exact travel time from each cell to ``t`` under the BMHA* edge costs.
+
+    Stops once every cell in ``sources`` is settled; cells that were never
+    settled keep an upper bound (or inf).
+    """
+    N = W * H
+    dist = np.full(N, np.inf)
+    closed = np.zeros(N, dtype=np.uint8)
+    pending = 0
+    is_src = np.zeros(N, dtype=np.uint8)
+    for s in sources:
+        if not is_src[s]:
+            is_src[s] = 1
+            pending += 1
+    nbr_len = _NBR_STEP * cell
+
+    dist[t] = 0.0
+    heap = [(0.0, t)]
+    while len(heap) > 0 and pending > 0:
+        d, u = heapq.heappop(heap)
+        if closed[u]:
+            continue
+        closed[u] = 1
+        if is_src[u]:
+            pending -= 1
+        ux, uy = u % W, u // W
+        for k in range(n_nbrs):
+            vx = ux + _NBR_DXY[k, 0]
+            vy = uy + _NBR_DXY[k, 1]
+            if vx < 0 or vy < 0 or vx >= W or vy >= H:
+                continue
+            v = vy * W + vx
+            if blocked[v] or closed[v]:
+                continue
+            # a drone at v moves v -> u, so cost the edge in that direction
+            cand = d + _edge_time(v_cell, W, H, v, vx, vy, u, ux, uy, nbr_len[k], samples, v_oob)
+            if cand < dist[v]:
+                dist[v] = cand
+                heapq.heappush(heap, (cand, v))
+    return dist
+
+
+@njit(cache=True)
+def _descend(dist, blocked, v_cell, W, H, cell, s, t, n_nbrs, samples, v_oob):
+    """Follow ``dist`` downhill from ``s``; the cell chain s..t, or empty if ``s`` can't reach ``t``."""
+    chain = np.empty(W * H, dtype=np.int32)
+    if not np.isfinite(dist[s]):
+        return chain[:0]
+    nbr_len = _NBR_STEP * cell
+    chain[0] = s
+    n = 1
+    u = s
+    while u != t and n < chain.shape[0]:
+        ux, uy = u % W, u // W
+        best, best_v = np.inf, -1
+        for k in range(n_nbrs):
+            vx = ux + _NBR_DXY[k, 0]
+            vy = uy + _NBR_DXY[k, 1]
+            if vx < 0 or vy < 0 or vx >= W or vy >= H:
+                continue
+            v = vy * W + vx
+            if blocked[v]:
+                continue
+            c = _edge_time(v_cell, W, H, u, ux, uy, v, vx, vy, nbr_len[k], samples, v_oob) + dist[v]
+            if c < best:
+                best, best_v = c, v
+        if best_v < 0:
+            return chain[:0]
+        u = best_v
+        chain[n] = u
+        n += 1
+    return chain[:n]
+
+
 class BanditMHAStar(Algorithm):
     """
     Multi-queue A* with bandit scheduling.
@@ -134,12 +511,17 @@ class BanditMHAStar(Algorithm):
 
     def __init__(self):
         self._grid: Optional[GridCacheBMHA] = None
-        self._last_tick: Dict[str, int] = {}
-        self._last_goal: Dict[str, Tuple[float, float]] = {}
-
-        self._replan_every = 20
-
-        self._push_counter = 0
+        self._blocked_flat: Optional[np.ndarray] = None
+        self._grid_key: Optional[Tuple[int, float, float, int]] = None
+        # recently used grids, so flipping cell size / clearance back and forth doesn't
+        # redo the distance transform and landmark Dijkstras; world.version in the key
+        # retires grids of swapped-out worlds
+        self._grid_lru: OrderedDict[Tuple[int, float, float, int], GridCacheBMHA] = OrderedDict()
+        self._grid_lru_size = 4
+        # per-cell speed limit for the current grid, keyed by (v_min, v_max, kappa)
+        self._v_cell: Optional[np.ndarray] = None
+        self._v_cell_key: Optional[Tuple[float, float, float]] = None
+        self._schedule = ReplanSchedule(every=20)
 
     def plan_paths(self, ctx: AlgoContext) -> None:
         p = ctx.params or {}
@@ -147,296 +529,107 @@ class BanditMHAStar(Algorithm):
         inflate = float(p.get("clearance_m", 6.0))
         cruise_alt = float(p.get("cruise_alt_m", 60.0))
 
-        if (self._grid is None) or (getattr(self._grid, "cell", None) != cell):
-            w_cells = max(1, int(ctx.world.size[0] // max(cell, 1.0)))
-            h_cells = max(1, int(ctx.world.size[1] // max(cell, 1.0)))
-            if w_cells * h_cells > 300_000 or len(ctx.world.obstacles) > 5000:
-                coarse = max(cell, 24.0)
-                try:
-                    self._grid = GridCacheBMHA.build(ctx.world, coarse, inflate)
-                except Exception:
-                    self._grid = GridCacheBMHA.build_fallback(ctx.world, coarse, inflate)
+        n_landmarks = max(0, int(p.get("landmarks", 4)))
+
+        grid_key = (ctx.world.version, cell, inflate, n_landmarks)
+        if self._grid is None or self._grid_key != grid_key:
+            self._grid_key = grid_key
+            grid = self._grid_lru.get(grid_key)
+            if grid is None:
+                grid = GridCacheBMHA.for_world(ctx.world, cell, inflate, n_landmarks)
+                self._grid_lru[grid_key] = grid
+                if len(self._grid_lru) > self._grid_lru_size:
+                    self._grid_lru.popitem(last=False)
             else:
-                self._grid = GridCacheBMHA.build(ctx.world, cell, inflate)
+                self._grid_lru.move_to_end(grid_key)
+            self._grid = grid
+            self._blocked_flat = grid.blocked.ravel()
+            self._v_cell = None
 
         tick = int(p.get("tick", 0))
 
-        for d in ctx.drones:
-            if not d.target:
-                continue
-            tgt = (d.target.x, d.target.y)
-            need = (
-                d.id not in self._last_tick
-                or self._last_goal.get(d.id) != tgt
-                or (tick - self._last_tick[d.id]) >= self._replan_every
-                or not d.path
-            )
-            if not need:
-                continue
-            d.path = self._plan_one(ctx.world, d.pos, d.target, cruise_alt, p)
-            self._last_goal[d.id] = tgt
-            self._last_tick[d.id] = tick
-
-    def _plan_one(self, world: World, start: Vec3, goal: Vec3, z: float, p: Dict) -> List[Vec3]:
-        gcache = self._grid
-        assert gcache is not None
-
-        v_max = float(p.get("v_max", 20.0))
         v_min = float(p.get("v_min", 4.0))
+        v_max = float(p.get("v_max", 20.0))
         clr_k = float(p.get("clr_kappa_m", 8.0))
+        if self._v_cell is None or self._v_cell_key != (v_min, v_max, clr_k):
+            self._v_cell = _speed_table(self._grid.clearance_m, v_min, v_max, clr_k)
+            self._v_cell_key = (v_min, v_max, clr_k)
+
+        # group due drones by goal cell; a goal shared by enough drones gets one
+        # reverse Dijkstra, and each of its drones just walks the time field downhill
+        by_goal: Dict[int, List[Tuple[Drone, int]]] = {}
+        for i in self._schedule.due(ctx.drones, tick):
+            d = ctx.drones[i]
+            by_goal.setdefault(self._cell_of(d.target), []).append((d, self._cell_of(d.pos)))
+
+        shared_min = int(p.get("shared_goal_min", 4))
+        for t_idx, group in by_goal.items():
+            if 0 < shared_min <= len(group):
+                paths = self._plan_shared(t_idx, [s for _, s in group], cruise_alt, p)
+            else:
+                paths = [self._plan_one(s_idx, t_idx, cruise_alt, p) for _, s_idx in group]
+            for (d, _), path in zip(group, paths):
+                d.path = path
+                self._schedule.mark(d, tick)
 
-        samples = int(p.get("edge_samples", 2))
-
-        use8 = bool(p.get("neighbors8", False))
-        N4 = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        N8 = N4 + [(-1, -1), (1, -1), (-1, 1), (1, 1)]
-        neigh = N8 if use8 else N4
-
-        w_clear = float(p.get("w_clear", 1.15))
-        w_landm = float(p.get("w_landmark", 1.0))
-        w_bear = float(p.get("w_bearing", 1.1))
-        gamma_bear = float(p.get("bearing_gamma", 0.2))
-        ucb_c = float(p.get("ucb_c", 0.8))
-        anchor_period = int(p.get("anchor_period", 6))
-        max_exp = int(p.get("max_expansions", 2500))
-        subopt_w = float(p.get("accept_suboptimal_w", 1.05))
-
-        G = gcache.from_world(goal.x, goal.y)
-        landmarks = [(0, 0), (gcache.w - 1, 0), (0, gcache.h - 1), (gcache.w - 1, gcache.h - 1)]
-        goal_lm_d = [math.hypot(lx - G[0], ly - G[1]) * gcache.cell for (lx, ly) in landmarks]
-
-        S = gcache.from_world(start.x, start.y)
-        T = G
-        if gcache.is_blocked(T):
-            T = self._nearest_free(T, gcache)
-        if gcache.is_blocked(S):
-            S = self._nearest_free(S, gcache)
-        if S == T:
-            return [gcache.to_world(S, z)]
-
-        g_cost: Dict[Coord, float] = {S: 0.0}
-        parent: Dict[Coord, Coord] = {}
-
-        open_anchor: List[Tuple[float, int, Coord]] = []
-        open_clear: List[Tuple[float, int, Coord]] = []
-        open_landm: List[Tuple[float, int, Coord]] = []
-        open_bear: List[Tuple[float, int, Coord]] = []
-        closed: Dict[Coord, bool] = {}
-
-        self._push_counter = 0
-        self._push(open_anchor, self._f_anchor(S, T, g_cost, v_max, gcache), S)
-        self._push(open_clear,  self._f_clear(S, T, g_cost, v_max, v_min, clr_k, w_clear, gcache), S)
-        self._push(open_landm,  self._f_landmark(S, T, g_cost, w_landm, landmarks, goal_lm_d, v_max, gcache), S)
-        self._push(open_bear,   self._f_bearing(S, T, g_cost, v_max, w_bear, gamma_bear, S, T, gcache), S)
-
-        pulls = [0, 0, 0, 0]
-        reward_sum = [0.0, 0.0, 0.0, 0.0]
-        total_pulls = 0
-
-        def reward_from_node(u: Coord, prev: float) -> float:
-            cur = self._h_euclid_time(u, T, v_max, gcache)
-            r = max(0.0, prev - cur)
-            return r, cur
-
-        last_progress = self._h_euclid_time(S, T, v_max, gcache)
-        goal_node: Optional[Coord] = None
-        expansions = 0
-
-        while expansions < max_exp:
-            expansions += 1
-            forced_anchor = (expansions % anchor_period == 0)
-
-            q_idx = self._choose_queue_ucb(
-                forced_anchor,
-                open_anchor, open_clear, open_landm, open_bear,
-                pulls, reward_sum, total_pulls, ucb_c
-            )
-
-            node = self._pop_valid(q_idx, open_anchor, open_clear, open_landm, open_bear, closed,
-                                   g_cost, S, T, v_max, v_min, clr_k,
-                                   w_clear, w_landm, w_bear, gamma_bear,
-                                   landmarks, goal_lm_d, gcache)
-            if node is None:
-                break
-            u = node
+    def _cell_of(self, pos: Vec3) -> int:
+        """Flat index of the free cell a world position plans from/to."""
+        gcache = self._grid
+        return gcache.idx(gcache.nearest_free(gcache.from_world(pos.x, pos.y)))
 
-            if u == T:
-                goal_node = u
-                if q_idx == 0:
-                    break
-                if g_cost.get(u, float("inf")) <= subopt_w * self._h_euclid_time(S, T, v_max, gcache):
-                    break
+    def _plan_shared(self, t_idx: int, sources: List[int], z: float, p: Dict) -> List[List[Vec3]]:
+        gcache = self._grid
+        W = gcache.w
+        n_nbrs = 8 if p.get("neighbors8", False) else 4
+        samples = int(p.get("edge_samples", 2))
+        v_min, v_max, clr_k = self._v_cell_key
+        v_oob = _speed_from_clearance(0.0, v_min, v_max, clr_k)
+        dist = _time_to_goal(self._blocked_flat, self._v_cell, W, gcache.h, float(gcache.cell), t_idx,
+                             np.asarray(sources, dtype=np.int64), n_nbrs, samples, v_oob)
+        goal = [gcache.to_world((t_idx % W, t_idx // W), z)]
+        paths = []
+        for s_idx in sources:
+            chain = _descend(dist, self._blocked_flat, self._v_cell, W, gcache.h, float(gcache.cell),
+                             s_idx, t_idx, n_nbrs, samples, v_oob)
+            paths.append(gcache.path_to_world(chain, z) if len(chain) else list(goal))
+        return paths
+
+    def _plan_one(self, s_idx: int, t_idx: int, z: float, p: Dict) -> List[Vec3]:
+        gcache = self._grid
+        assert gcache is not None
 
-            if closed.get(u, False):
-                continue
-            closed[u] = True
+        W = gcache.w
+        if s_idx == t_idx:
+            return [gcache.to_world((s_idx % W, s_idx // W), z)]
+
+        v_min, v_max, clr_k = self._v_cell_key
+        lm_dist = gcache.landmark_dist
+        if lm_dist is None:
+            lm_dist = np.empty((0, W * gcache.h), dtype=np.float32)
+        lm_goal = lm_dist[:, t_idx].astype(np.float64)
+        parent, reached, _ = _astar_core(
+            self._blocked_flat, self._v_cell, W, gcache.h, float(gcache.cell),
+            s_idx, t_idx, lm_dist, lm_goal,
+            8 if p.get("neighbors8", False) else 4,
+            int(p.get("edge_samples", 2)),
+            v_max, v_min, clr_k,
+            float(p.get("w_clear", 1.15)),
+            float(p.get("w_landmark", 1.0)),
+            float(p.get("w_bearing", 1.1)),
+            float(p.get("bearing_gamma", 0.2)),
+            float(p.get("ucb_c", 0.8)),
+            int(p.get("anchor_period", 6)),
+            int(p.get("max_expansions", 2500)),
+            float(p.get("accept_suboptimal_w", 1.05)),
+            bool(p.get("push_all_queues", False)),
+        )
 
-            pulls[q_idx] += 1
-            total_pulls += 1
+        if not reached and parent[t_idx] < 0:
+            return [gcache.to_world((t_idx % W, t_idx // W), z)]
 
-            ux, uy = u
-            for dx, dy in neigh:
-                v = (ux + dx, uy + dy)
-                if gcache.is_blocked(v):
-                    continue
-                length = gcache.cell if (dx == 0 or dy == 0) else (math.sqrt(2.0) * gcache.cell)
-                if samples <= 2:
-                    clr_a = gcache.clearance_m[gcache.idx(u)]
-                    clr_b = gcache.clearance_m[gcache.idx(v)]
-                    v_eff = min(
-                        _speed_from_clearance(clr_a, v_min, v_max, clr_k),
-                        _speed_from_clearance(clr_b, v_min, v_max, clr_k),
-                    )
-                else:
-                    min_clr = float("inf")
-                    ax, ay = u; bx, by = v
-                    for k in range(samples):
-                        t = k / (samples - 1)
-                        sx = int(round(ax + t * (bx - ax)))
-                        sy = int(round(ay + t * (by - ay)))
-                        if sx < 0 or sy < 0 or sx >= gcache.w or sy >= gcache.h:
-                            min_clr = 0.0
-                            break
-                        min_clr = min(min_clr, gcache.clearance_m[gcache.idx((sx, sy))])
-                    v_eff = _speed_from_clearance(min_clr, v_min, v_max, clr_k)
-
-                edge_time = length / max(1e-6, v_eff)
-                cand = g_cost.get(u, float("inf")) + edge_time
-                if cand + 1e-12 < g_cost.get(v, float("inf")):
-                    g_cost[v] = cand
-                    parent[v] = u
-                    self._push(open_anchor, self._f_anchor(v, T, g_cost, v_max, gcache), v)
-                    self._push(open_clear,  self._f_clear(v, T, g_cost, v_max, v_min, clr_k, w_clear, gcache), v)
-                    self._push(open_landm,  self._f_landmark(v, T, g_cost, w_landm, landmarks, goal_lm_d, v_max, gcache), v)
-                    self._push(open_bear,   self._f_bearing(v, T, g_cost, v_max, w_bear, gamma_bear, S, T, gcache), v)
-
-            r, last_progress = reward_from_node(u, last_progress)
-            reward_sum[q_idx] += r
-
-        if goal_node is None:
-            if T in parent or T == S:
-                goal_node = T
-            else:
-                return [gcache.to_world(T, z)]
-
-        cur = goal_node
-        if cur not in parent and cur != S:
-            return [gcache.to_world(S, z), gcache.to_world(cur, z)]
-        chain: List[Coord] = []
-        while cur != S:
-            chain.append(cur)
-            cur = parent.get(cur, S)
-            if cur == S:
-                chain.append(S)
-                break
+        parent = parent.tolist()
+        chain = [t_idx]
+        while chain[-1] != s_idx:
+            chain.append(parent[chain[-1]])
         chain.reverse()
-        return [gcache.to_world(c, z) for c in chain]
-
-    def _h_euclid_time(self, n: Coord, t: Coord, v_max: float, gcache: GridCacheBMHA) -> float:
-        return (math.hypot(n[0] - t[0], n[1] - t[1]) * gcache.cell) / max(1e-6, v_max)
-
-    def _h_clear_time(self, n: Coord, t: Coord, v_max: float, v_min: float, clr_k: float, gcache: GridCacheBMHA) -> float:
-        clr = gcache.clearance_m[gcache.idx(n)]
-        v_est = _speed_from_clearance(clr, v_min, v_max, clr_k)
-        return (math.hypot(n[0] - t[0], n[1] - t[1]) * gcache.cell) / max(1e-6, v_est)
-
-    def _h_landmark_time(self, n: Coord, t: Coord, landmarks: List[Coord], goal_lm_d: List[float], v_max: float, gcache: GridCacheBMHA) -> float:
-        best = 0.0
-        for idx, (lx, ly) in enumerate(landmarks):
-            d_n = math.hypot(n[0] - lx, n[1] - ly) * gcache.cell
-            d_t = goal_lm_d[idx]
-            best = max(best, abs(d_n - d_t))
-        return best / max(1e-6, v_max)
-
-    def _bearing_alignment(self, S: Coord, T: Coord, n: Coord) -> float:
-        sx, sy = S; tx, ty = T; nx, ny = n
-        g1 = (tx - sx, ty - sy)
-        g2 = (tx - nx, ty - ny)
-        def norm(v): 
-            return math.hypot(v[0], v[1]) + 1e-9
-        return max(-1.0, min(1.0, (g1[0]*g2[0] + g1[1]*g2[1]) / (norm(g1) * norm(g2))))
-
-    def _h_bearing_time(self, n: Coord, t: Coord, S: Coord, T: Coord, v_max: float, gamma: float, gcache: GridCacheBMHA) -> float:
-        h = self._h_euclid_time(n, t, v_max, gcache)
-        align = self._bearing_alignment(S, T, n)
-        return max(0.0, h * (1.0 - gamma * align))
-
-    def _f_anchor(self, n: Coord, t: Coord, g_cost: Dict[Coord, float], v_max: float, gcache: GridCacheBMHA) -> float:
-        return g_cost.get(n, float("inf")) + self._h_euclid_time(n, t, v_max, gcache)
-
-    def _f_clear(self, n: Coord, t: Coord, g_cost: Dict[Coord, float], v_max: float, v_min: float, clr_k: float, w: float, gcache: GridCacheBMHA) -> float:
-        return g_cost.get(n, float("inf")) + w * self._h_clear_time(n, t, v_max, v_min, clr_k, gcache)
-
-    def _f_landmark(self, n: Coord, t: Coord, g_cost: Dict[Coord, float], w: float, landmarks: List[Coord], goal_lm_d: List[float], v_max: float, gcache: GridCacheBMHA) -> float:
-        return g_cost.get(n, float("inf")) + w * self._h_landmark_time(n, t, landmarks, goal_lm_d, v_max, gcache)
-
-    def _f_bearing(self, n: Coord, t: Coord, g_cost: Dict[Coord, float], v_max: float, w: float, gamma: float, S: Coord, T: Coord, gcache: GridCacheBMHA) -> float:
-        return g_cost.get(n, float("inf")) + w * self._h_bearing_time(n, t, S, T, v_max, gamma, gcache)
-
-    def _push(self, heap: List[Tuple[float, int, Coord]], key: float, node: Coord) -> None:
-        self._push_counter += 1
-        heapq.heappush(heap, (key, self._push_counter, node))
-
-    def _pop_valid(self, q_idx: int,
-                   open_anchor, open_clear, open_landm, open_bear,
-                   closed: Dict[Coord, bool], g_cost: Dict[Coord, float],
-                   S: Coord, T: Coord, v_max: float, v_min: float, clr_k: float,
-                   w_clear: float, w_landm: float, w_bear: float, gamma_bear: float,
-                   landmarks: List[Coord], goal_lm_d: List[float],
-                   gcache: GridCacheBMHA) -> Optional[Coord]:
-        heap = [open_anchor, open_clear, open_landm, open_bear][q_idx]
-        while heap:
-            key, _, n = heapq.heappop(heap)
-            if closed.get(n, False):
-                continue
-            if q_idx == 0:
-                cur = self._f_anchor(n, T, g_cost, v_max, gcache)
-            elif q_idx == 1:
-                cur = self._f_clear(n, T, g_cost, v_max, v_min, clr_k, w_clear, gcache)
-            elif q_idx == 2:
-                cur = self._f_landmark(n, T, g_cost, w_landm, landmarks, goal_lm_d, v_max, gcache)
-            else:
-                cur = self._f_bearing(n, T, g_cost, v_max, w_bear, gamma_bear, S, T, gcache)
-            if cur > key + 1e-12:
-                continue
-            return n
-        return None
-
-    def _choose_queue_ucb(self, force_anchor: bool,
-                          open_anchor, open_clear, open_landm, open_bear,
-                          pulls: List[int], reward_sum: List[float], total_pulls: int, c: float) -> int:
-        if force_anchor and open_anchor:
-            return 0
-        avail = []
-        if open_anchor: avail.append(0)
-        if open_clear:  avail.append(1)
-        if open_landm:  avail.append(2)
-        if open_bear:   avail.append(3)
-        if not avail:
-            return 0
-        for i in avail:
-            if pulls[i] == 0:
-                return i
-        best_i = avail[0]
-        best_score = -1e18
-        for i in avail:
-            avg = reward_sum[i] / max(1, pulls[i])
-            score = avg + c * math.sqrt(math.log(max(1, total_pulls)) / pulls[i])
-            if score > best_score:
-                best_score = score
-                best_i = i
-        return best_i
-
-    def _nearest_free(self, g0: Coord, grid: GridCacheBMHA) -> Coord:
-        if not grid.is_blocked(g0):
-            return g0
-        for r in range(1, 50):
-            for dx in range(-r, r + 1):
-                for dy in (-r, r):
-                    c = (g0[0] + dx, g0[1] + dy)
-                    if not grid.is_blocked(c): return c
-            for dy in range(-r + 1, r):
-                for dx in (-r, r):
-                    c = (g0[0] + dx, g0[1] + dy)
-                    if not grid.is_blocked(c): return c
-        return g0
+        return gcache.path_to_world(chain, z)
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, List
 
+import numpy as np
+
 from ...models import Drone, World
 
 
@@ -16,3 +18,48 @@ class Algorithm:
     name: str = "base"
     def plan_paths(self, ctx: AlgoContext) -> None:
         raise NotImplementedError
+
+
+class ReplanSchedule:
+    """Tracks when each drone was last planned and toward which goal.
+
+    State lives in dense arrays indexed by a per-id slot, so the per-tick
+    "who needs a new plan" check is one vectorized mask over all drones.
+    """
+
+    _NEVER = np.iinfo(np.int64).min // 2
+
+    def __init__(self, every: int):
+        self.every = every
+        self._slot: Dict[str, int] = {}
+        self._tick = np.empty(0, dtype=np.int64)
+        self._goal = np.empty((0, 2))
+
+    def _slots(self, drones: List[Drone]) -> np.ndarray:
+        slot = self._slot
+        idx = np.fromiter((slot.setdefault(d.id, len(slot)) for d in drones), dtype=np.int64, count=len(drones))
+        if len(slot) > len(self._tick):
+            grow = max(len(slot), 2 * len(self._tick)) - len(self._tick)
+            self._tick = np.concatenate([self._tick, np.full(grow, self._NEVER, dtype=np.int64)])
+            self._goal = np.concatenate([self._goal, np.full((grow, 2), np.nan)])
+        return idx
+
+    def due(self, drones: List[Drone], tick: int) -> List[int]:
+        """Positions in ``drones`` that have a target and are due for (re)planning."""
+        if not drones:
+            return []
+        idx = self._slots(drones)
+        tgt = np.array([(d.target.x, d.target.y) if d.target else (np.nan, np.nan) for d in drones])
+        has_target = ~np.isnan(tgt[:, 0])
+        no_path = np.fromiter((not d.path for d in drones), dtype=bool, count=len(drones))
+        need = (
+            (self._goal[idx] != tgt).any(axis=1)
+            | (tick - self._tick[idx] >= self.every)
+            | no_path
+        )
+        return np.flatnonzero(has_target & need).tolist()
+
+    def mark(self, drone: Drone, tick: int) -> None:
+        i = self._slot[drone.id]
+        self._tick[i] = tick
+        self._goal[i] = (drone.target.x, drone.target.y)
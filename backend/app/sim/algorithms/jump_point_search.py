@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ...models import Vec3
+from ..jit import njit
+from .bandit_mha_star import GridCacheBMHA
+from .base import AlgoContext, Algorithm, ReplanSchedule
+
+SQRT2 = math.sqrt(2.0)
+
+# Open-set entries are uint64: quantized f in the high 32 bits, flat cell index
+# in the low 32, so one integer compare orders the heap and ties break on index.
+_F_SCALE = 1024.0
+_IDX_MASK = np.uint64(0xFFFFFFFF)
+_HI_SHIFT = np.uint64(32)
+
+
+@njit(cache=True)
+def _heap_push(heap, size, e):
+    i = size
+    heap[i] = e
+    while i > 0:
+        parent = (i - 1) >> 1
+        if heap[parent] <= e:
+            break
+        heap[i] = heap[parent]
+        i = parent
+    heap[i] = e
+    return size + 1
+
+
+@njit(cache=True)
+def _heap_pop(heap, size):
+    top = heap[0]
+    size -= 1
+    e = heap[size]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and heap[child + 1] < heap[child]:
+            child += 1
+        if heap[child] >= e:
+            break
+        heap[i] = heap[child]
+        i = child
+    if size > 0:
+        heap[i] = e
+    return top, size
+
+
+@njit(cache=True)
+def _pack(f, idx):
+    q = min(f * _F_SCALE, 4294967295.0)
+    return (np.uint64(q) << _HI_SHIFT) | np.uint64(idx)
+
+
+@njit(cache=True)
+def _free(blocked, W, H, x, y):
+    return 0 <= x < W and 0 <= y < H and blocked[y * W + x] == 0
+
+
+@njit(cache=True)
+def _h_octile(x, y, tx, ty, cell):
+    ax, ay = abs(x - tx), abs(y - ty)
+    return (max(ax, ay) + (SQRT2 - 1.0) * min(ax, ay)) * cell
+
+
+@njit(cache=True)
+def _jump_straight(blocked, W, H, x, y, dx, dy, tx, ty):
+    while True:
+        x += dx; y += dy
+        if not _free(blocked, W, H, x, y):
+            return -1
+        if x == tx and y == ty:
+            return y * W + x
+        if dx != 0:
+            if (_free(blocked, W, H, x, y - 1) and not _free(blocked, W, H, x - dx, y - 1)) or \
+               (_free(blocked, W, H, x, y + 1) and not _free(blocked, W, H, x - dx, y + 1)):
+                return y * W + x
+        else:
+            if (_free(blocked, W, H, x - 1, y) and not _free(blocked, W, H, x - 1, y - dy)) or \
+               (_free(blocked, W, H, x + 1, y) and not _free(blocked, W, H, x + 1, y - dy)):
+                return y * W + x
+
+
+@njit(cache=True)
+def _jump(blocked, W, H, x, y, dx, dy, tx, ty):
+    """Scan from (x, y) along (dx, dy); flat index of the first jump point, or -1."""
+    if dx == 0 or dy == 0:
+        return _jump_straight(blocked, W, H, x, y, dx, dy, tx, ty)
+    while True:
+        x += dx; y += dy
+        if not _free(blocked, W, H, x, y):
+            return -1
+        if x == tx and y == ty:
+            return y * W + x
+        if _jump_straight(blocked, W, H, x, y, dx, 0, tx, ty) >= 0 or \
+           _jump_straight(blocked, W, H, x, y, 0, dy, tx, ty) >= 0:
+            return y * W + x
+        # diagonal steps may not cut a blocked corner
+        if not _free(blocked, W, H, x + dx, y) or not _free(blocked, W, H, x, y + dy):
+            return -1
+
+
+@njit(cache=True)
+def _successor_dirs(blocked, W, H, x, y, par, out):
+    """Fill ``out`` with the pruned scan directions from (x, y); returns how many."""
+    n = 0
+    if par < 0:
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            if _free(blocked, W, H, x + dx, y + dy):
+                out[n, 0] = dx; out[n, 1] = dy; n += 1
+        for dx, dy in ((-1, -1), (1, -1), (-1, 1), (1, 1)):
+            if _free(blocked, W, H, x + dx, y) and _free(blocked, W, H, x, y + dy):
+                out[n, 0] = dx; out[n, 1] = dy; n += 1
+        return n
+
+    px, py = par % W, par // W
+    dx = int(x > px) - int(x < px)
+    dy = int(y > py) - int(y < py)
+    if dx != 0 and dy != 0:
+        vert = _free(blocked, W, H, x, y + dy)
+        horz = _free(blocked, W, H, x + dx, y)
+        if vert:
+            out[n, 0] = 0; out[n, 1] = dy; n += 1
+        if horz:
+            out[n, 0] = dx; out[n, 1] = 0; n += 1
+        if vert and horz:
+            out[n, 0] = dx; out[n, 1] = dy; n += 1
+    elif dx != 0:
+        up = _free(blocked, W, H, x, y + 1)
+        down = _free(blocked, W, H, x, y - 1)
+        if _free(blocked, W, H, x + dx, y):
+            out[n, 0] = dx; out[n, 1] = 0; n += 1
+            if up:
+                out[n, 0] = dx; out[n, 1] = 1; n += 1
+            if down:
+                out[n, 0] = dx; out[n, 1] = -1; n += 1
+        if up:
+            out[n, 0] = 0; out[n, 1] = 1; n += 1
+        if down:
+            out[n, 0] = 0; out[n, 1] = -1; n += 1
+    else:
+        right = _free(blocked, W, H, x + 1, y)
+        left = _free(blocked, W, H, x - 1, y)
+        if _free(blocked, W, H, x, y + dy):
+            out[n, 0] = 0; out[n, 1] = dy; n += 1
+            if right:
+                out[n, 0] = 1; out[n, 1] = dy; n += 1
+            if left:
+                out[n, 0] = -1; out[n, 1] = dy; n += 1
+        if right:
+            out[n, 0] = 1; out[n, 1] = 0; n += 1
+        if left:
+            out[n, 0] = -1; out[n, 1] = 0; n += 1
+    return n
+
+
+@njit(cache=True)
+def _jps_search(blocked, W, H, s, t, cell):
+    """Returns (parent, found); parent holds the flat index of each jump point's predecessor."""
+    N = W * H
+    g = np.full(N, np.inf, dtype=np.float32)
+    parent = np.full(N, -1, dtype=np.int32)
+    closed = np.zeros(N, dtype=np.uint8)
+    heap = np.empty(max(16, N), dtype=np.uint64)
+    dirs = np.empty((8, 2), dtype=np.int64)
+    tx, ty = t % W, t // W
+
+    g[s] = 0.0
+    size = _heap_push(heap, 0, _pack(_h_octile(s % W, s // W, tx, ty, cell), s))
+    while size > 0:
+        e, size = _heap_pop(heap, size)
+        u = np.int64(e & _IDX_MASK)
+        if closed[u]:
+            continue  # stale entry, the node was settled through a cheaper push
+        if u == t:
+            return parent, True
+        closed[u] = 1
+
+        ux, uy = u % W, u // W
+        n = _successor_dirs(blocked, W, H, ux, uy, parent[u], dirs)
+        for k in range(n):
+            dx, dy = dirs[k, 0], dirs[k, 1]
+            jp = _jump(blocked, W, H, ux, uy, dx, dy, tx, ty)
+            if jp < 0 or closed[jp]:
+                continue
+            jx, jy = jp % W, jp // W
+            # jump segments are pure straight or pure diagonal runs
+            steps = max(abs(jx - ux), abs(jy - uy))
+            cand = g[u] + steps * (SQRT2 if dx != 0 and dy != 0 else 1.0) * cell
+            if cand < g[jp]:
+                g[jp] = cand
+                parent[jp] = u
+                if size == heap.shape[0]:
+                    grown = np.empty(2 * size, dtype=np.uint64)
+                    grown[:size] = heap[:size]
+                    heap = grown
+                size = _heap_push(heap, size, _pack(cand + _h_octile(jx, jy, tx, ty, cell), jp))
+    return parent, False
+
+
+class JumpPointSearch(Algorithm):
+    """
+    Jump Point Search over the inflated occupancy grid.
+
+    Uniform step cost (cell for straight moves, sqrt(2)*cell for diagonals),
+    8-connected without corner cutting. Straight runs through open streets are
+    scanned in a tight loop and only jump points (goal, forced neighbours) are
+    pushed onto the open set, so open maps expand O(perimeter) nodes rather
+    than O(area). Paths are optimal for the same cost model as plain A*.
+    """
+
+    name = "jump_point_search"
+
+    def __init__(self):
+        self._grid: Optional[GridCacheBMHA] = None
+        self._grid_key: Optional[Tuple[int, float, float]] = None
+        self._blocked_u8: Optional[np.ndarray] = None
+        # (start idx, goal idx, altitude) -> path; only valid for the current grid
+        self._path_cache: Dict[Tuple[int, int, float], List[Vec3]] = {}
+        self._schedule = ReplanSchedule(every=20)
+
+    def plan_paths(self, ctx: AlgoContext) -> None:
+        p = ctx.params or {}
+        cell = float(p.get("grid_cell_m", 20.0))
+        inflate = float(p.get("clearance_m", 6.0))
+        cruise_alt = float(p.get("cruise_alt_m", 60.0))
+
+        grid_key = (ctx.world.version, cell, inflate)
+        if self._grid is None or self._grid_key != grid_key:
+            self._grid_key = grid_key
+            self._grid = GridCacheBMHA.for_world(ctx.world, cell, inflate)
+            self._blocked_u8 = self._grid.blocked.ravel()
+            self._path_cache.clear()
+
+        tick = int(p.get("tick", 0))
+
+        for i in self._schedule.due(ctx.drones, tick):
+            d = ctx.drones[i]
+            d.path = self._plan_one(d.pos, d.target, cruise_alt)
+            self._schedule.mark(d, tick)
+
+    def _plan_one(self, start: Vec3, goal: Vec3, z: float) -> List[Vec3]:
+        grid = self._grid
+        assert grid is not None
+
+        S = grid.nearest_free(grid.from_world(start.x, start.y))
+        T = grid.nearest_free(grid.from_world(goal.x, goal.y))
+        if S == T:
+            return [grid.to_world(S, z)]
+
+        W = grid.w
+        s_idx = S[1] * W + S[0]
+        t_idx = T[1] * W + T[0]
+        key = (s_idx, t_idx, z)
+        cached = self._path_cache.get(key)
+        if cached is not None:
+            return list(cached)  # drones pop waypoints off their own list
+
+        parent, found = _jps_search(self._blocked_u8, W, grid.h, s_idx, t_idx, float(grid.cell))
+        if not found:
+            return [grid.to_world(T, z)]
+
+        parent = parent.tolist()
+        jumps = [t_idx]
+        while jumps[-1] != s_idx:
+            jumps.append(parent[jumps[-1]])
+        jumps.reverse()
+        # expand jump segments to per-cell steps; a segment is a straight or 45-degree run
+        chain = [s_idx]
+        for a, b in zip(jumps, jumps[1:]):
+            ax, ay = a % W, a // W
+            bx, by = b % W, b // W
+            step = ((by > ay) - (by < ay)) * W + ((bx > ax) - (bx < ax))
+            chain.extend(range(a + step, b + step, step))
+        path = grid.path_to_world(chain, z)
+        if len(self._path_cache) >= 1024:
+            self._path_cache.clear()
+        self._path_cache[key] = path
+        return list(path)
@@ -1,12 +1,16 @@
 from typing import Dict, Type
 
+from ...models import Building, Drone, Vec3, World
+from ..jit import HAVE_NUMBA
 from .bandit_mha_star import BanditMHAStar
-from .base import Algorithm
+from .base import AlgoContext, Algorithm
+from .jump_point_search import JumpPointSearch
 from .straight_line import StraightLine
 
 _REGISTRY: Dict[str, Type[Algorithm]] = {
     StraightLine.name: StraightLine,
     BanditMHAStar.name: BanditMHAStar,
+    JumpPointSearch.name: JumpPointSearch,
 }
 
 def available_algorithms() -> list[str]:
@@ -15,4 +19,22 @@ def available_algorithms() -> list[str]:
 def build_algorithm(name: str) -> Algorithm:
     if name not in _REGISTRY:
         raise KeyError(f"Unknown algorithm '{name}'")
-    return _REGISTRY[name]() 
+    return _REGISTRY[name]()
+
+def warm_up() -> None:
+    """Plan once with every algorithm on a tiny world.
+
+    Forces numba to compile the planner kernels (or load them from its on-disk
+    cache) up front, so the first real plan doesn't stall the simulation.
+    """
+    if not HAVE_NUMBA:
+        return
+    world = World(size=(200.0, 200.0, 50.0), obstacles=[
+        Building(id="warmup", center=Vec3(x=100.0, y=100.0, z=10.0), size=Vec3(x=40.0, y=40.0, z=20.0)),
+    ])
+    for cls in _REGISTRY.values():
+        # a few drones sharing a goal too, so planners that batch per goal compile that path
+        drones = [Drone(id="warmup", pos=Vec3(x=10.0, y=10.0), target=Vec3(x=190.0, y=190.0, z=60.0))]
+        drones += [Drone(id=f"warmup{i}", pos=Vec3(x=10.0 + 20.0 * i, y=190.0), target=Vec3(x=190.0, y=10.0, z=60.0))
+                   for i in range(4)]
+        cls().plan_paths(AlgoContext(world=world, drones=drones, params={"tick": 0, "grid_cell_m": 10.0}))
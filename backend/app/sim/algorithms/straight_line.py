@@ -1,11 +1,21 @@
+from typing import Dict
+
 from ...models import Vec3
 from .base import AlgoContext, Algorithm
 
 
 class StraightLine(Algorithm):
     name = "straight_line"
+
+    def __init__(self):
+        # target object each drone's path was last set from; a new target (or a
+        # new drone list) is a new object, so an identity check finds the changes.
+        # An emptied path (waypoint reached / cleared) is refilled as before.
+        self._last_target: Dict[str, Vec3] = {}
+
     def plan_paths(self, ctx: AlgoContext) -> None:
-        speed = float(ctx.params.get("speed", 30.0))
+        last = self._last_target
         for d in ctx.drones:
-            if d.target:
-                d.path = [d.target] 
+            if d.target and (not d.path or last.get(d.id) is not d.target):
+                d.path = [d.target]
+                last[d.id] = d.target
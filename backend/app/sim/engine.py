@@ -17,6 +17,11 @@ class SimulationEngine:
     tick: int = 0
     tick_rate_hz: int = 20
 
+    def set_world(self, world: World):
+        # planners key their grid caches on the version, so a swapped world never reuses a stale grid
+        world._bump_version(self.world.version)
+        self.world = world
+
     def set_algorithm(self, name: str):
         self.algorithm = build_algorithm(name)
 
@@ -0,0 +1,19 @@
+"""Optional Numba support.
+
+Kernels are written as plain loops over numpy arrays and decorated with
+``njit``. When numba is not installed they run as ordinary Python.
+"""
+try:
+    from numba import njit
+
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def wrap(fn):
+            return fn
+        return wrap
@@ -1,20 +1,108 @@
 from __future__ import annotations
 
+import asyncio
 import math
+import os
 import random
-import uuid
-from typing import Dict, List, Tuple
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 
-import requests
+import httpx
+import numpy as np
+import orjson
 from pyproj import Transformer
 
-from ..models import Building, Vec3, World
+from ..models import BuildingSoA, World
 
 BBox = Tuple[float, float, float, float]
 
+# Transformers are costly to build (PROJ pipeline setup) and thread-safe since
+# pyproj 3.1, so keep one per target EPSG for the life of the process.
+_TRANSFORMER_CACHE: Dict[int, Transformer] = {}
+
+
+def _get_transformer(epsg: int) -> Transformer:
+    """EPSG:4326 (lon, lat) -> ``epsg`` transformer, built once per code."""
+    tf = _TRANSFORMER_CACHE.get(epsg)
+    if tf is None:
+        tf = _TRANSFORMER_CACHE[epsg] = Transformer.from_crs("EPSG:4326", f"EPSG:{epsg}", always_xy=True)
+    return tf
+
+
+_WEB_MERCATOR_R = 6378137.0
+
+
+def _project(lons: np.ndarray, lats: np.ndarray, epsg: int) -> Tuple[np.ndarray, np.ndarray]:
+    """lon/lat degrees -> projected meters in ``epsg``.
+
+    EPSG:3857 is spherical Web Mercator, a closed form, so it is evaluated with
+    numpy ufuncs; other codes go through PROJ.
+    """
+    if epsg == 3857:
+        x = _WEB_MERCATOR_R * np.deg2rad(lons)
+        y = _WEB_MERCATOR_R * np.log(np.tan(np.pi / 4 + np.deg2rad(lats) / 2))
+        return x, y
+    xs, ys = _get_transformer(epsg).transform(lons, lats)
+    return np.asarray(xs), np.asarray(ys)
+
+
+# Overpass allows one running query per client IP. Semaphores bind to the loop
+# they are first awaited on and the blocking wrapper below runs its own loop,
+# so keep one gate per event loop.
+_OVERPASS_GATES: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+
+def _overpass_gate() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    gate = _OVERPASS_GATES.get(loop)
+    if gate is None:
+        gate = _OVERPASS_GATES[loop] = asyncio.Semaphore(1)
+    return gate
+
+
+def _build_overpass_query(bbox: BBox, feature_blocks: List[str], limit: int, timeout_s: int) -> str:
+    """One Overpass QL request for all ``feature_blocks`` (e.g. ``'way["building"]'``) in ``bbox``.
+
+    Overpass runs one query per client at a time, so extra feature types belong
+    in this union rather than in separate requests.
+    """
+    north, south, east, west = bbox
+    union = "".join(f"      {block}({south},{west},{north},{east});\n" for block in feature_blocks)
+    return f"""
+    [out:json][timeout:{int(timeout_s)}];
+    (
+{union}    );
+    out center qt {limit};
+    """
+
+
+async def _fetch_overpass_elements(query: str, overpass_url: str, timeout_s: int) -> List[Dict[str, Any]]:
+    async with _overpass_gate():
+        async with httpx.AsyncClient(timeout=timeout_s + 5) as client:
+            resp = await client.post(overpass_url, data={"data": query})
+    resp.raise_for_status()
+    data = orjson.loads(resp.content)
+    # timeouts / out-of-memory come back as 200 with a remark and partial or no elements
+    remark = data.get("remark")
+    if remark:
+        raise RuntimeError(f"Overpass query failed: {remark}")
+    return data.get("elements", [])
+
+
+def _random_ids(n: int) -> List[str]:
+    """``n`` random 128-bit hex ids from a single ``os.urandom`` draw."""
+    raw = os.urandom(16 * n).hex()
+    return [raw[i:i + 32] for i in range(0, 32 * n, 32)]
+
 
 def _levels_to_height_from_tags(tags: dict, default_h: float, floor_h: float) -> float:
-    lv = tags.get("building:levels") or tags.get("levels")
+    return _levels_to_height(tags.get("building:levels") or tags.get("levels"), default_h, floor_h)
+
+
+# OSM level tags are a small set of strings ("2", "3", "12", ...), so parse each once
+@lru_cache(maxsize=128)
+def _levels_to_height(lv: str | None, default_h: float, floor_h: float) -> float:
     if lv is None:
         return default_h
     try:
@@ -25,39 +113,48 @@ def _levels_to_height_from_tags(tags: dict, default_h: float, floor_h: float) ->
 
 
 def _grid_thin_uniform(
-    pts: List[Tuple[float, float, Dict]],
+    xs: np.ndarray,
+    ys: np.ndarray,
     world_w: float,
     world_h: float,
     target: int,
     jitter_frac: float = 0.35,
-) -> List[Tuple[float, float, Dict]]:
-    """Spread points over the world by keeping at most one per grid cell."""
-    if not pts or target <= 0 or world_w <= 0 or world_h <= 0:
-        return []
+    rng: np.random.Generator | None = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Spread points over the world as one building per occupied grid tile.
+
+    Tiles are ranked by how many points fall in them (RASTER-style counting), so
+    when ``target`` is below the number of occupied tiles the dense ones win.
+    Each kept tile emits a single point at its centroid, jittered. Returns
+    (x, y, source) arrays, ``source`` being the index of the tile's first input point.
+    """
+    if len(xs) == 0 or target <= 0 or world_w <= 0 or world_h <= 0:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+    rng = rng if rng is not None else np.random.default_rng()
     area = max(1e-6, world_w * world_h)
     cell = math.sqrt(area / max(1, target))
-    random.shuffle(pts)
-    seen = set()
-    kept: List[Tuple[float, float, Dict]] = []
-    for x, y, tags in pts:
-        gx = int(x // cell); gy = int(y // cell)
-        key = (gx, gy)
-        if key in seen:
-            continue
-        seen.add(key)
-        # jitter within the cell
-        jx = (random.random() - 0.5) * jitter_frac * cell
-        jy = (random.random() - 0.5) * jitter_frac * cell
-        cx = min(max(0.0, (gx + 0.5) * cell + jx), world_w)
-        cy = min(max(0.0, (gy + 0.5) * cell + jy), world_h)
-        kept.append((cx, cy, tags))
-        if len(kept) >= target:
-            break
-    return kept
-
-
-
-def world_from_osm_bbox_fast_centers(
+
+    gx = np.floor_divide(xs, cell).astype(np.int64)
+    gy = np.floor_divide(ys, cell).astype(np.int64)
+    keys = (gx.astype(np.uint64) << np.uint64(32)) | (gy.astype(np.uint64) & np.uint64(0xFFFFFFFF))
+    _, first, tile, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+    tile = tile.ravel()
+    mx = np.bincount(tile, weights=xs) / counts
+    my = np.bincount(tile, weights=ys) / counts
+
+    # densest tiles first; random order among equal counts
+    keep = np.lexsort((rng.random(len(counts)), -counts))[:target]
+
+    # jitter around the centroid
+    jx = (rng.random(len(keep)) - 0.5) * jitter_frac * cell
+    jy = (rng.random(len(keep)) - 0.5) * jitter_frac * cell
+    cx = np.clip(mx[keep] + jx, 0.0, world_w)
+    cy = np.clip(my[keep] + jy, 0.0, world_h)
+    return cx, cy, first[keep]
+
+
+
+async def world_from_osm_bbox_fast_centers_async(
     bbox: BBox,
     *,
     target_buildings: int | None = None,  
@@ -84,70 +181,105 @@ def world_from_osm_bbox_fast_centers(
     req_limit = int(limit * max(1.0, oversample))
     req_limit = max(50, min(req_limit, 2000))
 
-    query = f"""
-    [out:json][timeout:{int(timeout_s)}];
-    way["building"]({south},{west},{north},{east});
-    out center qt {req_limit};
-    """
-    resp = requests.post(overpass_url, data={"data": query}, timeout=timeout_s + 5)
-    resp.raise_for_status()
-    data = resp.json()
-
-    elements = data.get("elements", [])
+    query = _build_overpass_query(bbox, ['way["building"]'], req_limit, timeout_s)
+    elements = await _fetch_overpass_elements(query, overpass_url, timeout_s)
     if not elements:
         return World(size=(100.0, 100.0, 50.0), obstacles=[])
 
-    # project bbox & points to meters; origin at (west, south)
-    to_m = Transformer.from_crs("EPSG:4326", f"EPSG:{proj_epsg}", always_xy=True)
-    minx_m, miny_m = to_m.transform(west, south)
-    maxx_m, maxy_m = to_m.transform(east, north)
-    world_w = float(maxx_m - minx_m)
-    world_h = float(maxy_m - miny_m)
-
-    pts: List[Tuple[float, float, Dict]] = []
-    for el in elements:
-        center = el.get("center")
-        if not center:
-            continue
-        lon = float(center["lon"]); lat = float(center["lat"])
-        x_m, y_m = to_m.transform(lon, lat)
-        pts.append((float(x_m - minx_m), float(y_m - miny_m), el.get("tags", {})))
+    # projection + synthesis is CPU work; keep it off the event loop
+    return await asyncio.to_thread(
+        _world_from_centers, elements, bbox,
+        target_buildings=target_buildings,
+        req_limit=req_limit,
+        default_height_m=default_height_m,
+        floor_height_m=floor_height_m,
+        width_range_m=width_range_m,
+        depth_range_m=depth_range_m,
+        jitter_frac=jitter_frac,
+        backfill=backfill,
+        fit_to_buildings=fit_to_buildings,
+        ceiling_margin_m=ceiling_margin_m,
+        proj_epsg=proj_epsg,
+    )
+
+
+def world_from_osm_bbox_fast_centers(bbox: BBox, **kwargs: Any) -> World:
+    """Blocking wrapper around ``world_from_osm_bbox_fast_centers_async`` for callers without a loop."""
+    return asyncio.run(world_from_osm_bbox_fast_centers_async(bbox, **kwargs))
+
+
+def _world_from_centers(
+    elements: List[Dict[str, Any]],
+    bbox: BBox,
+    *,
+    target_buildings: int | None,
+    req_limit: int,
+    default_height_m: float,
+    floor_height_m: float,
+    width_range_m: Tuple[float, float],
+    depth_range_m: Tuple[float, float],
+    jitter_frac: float,
+    backfill: bool,
+    fit_to_buildings: bool,
+    ceiling_margin_m: float,
+    proj_epsg: int,
+) -> World:
+    north, south, east, west = bbox
+
+    # Overpass JSON -> (lon, lat) rows behind the two bbox corners, projected to
+    # meters in one batch; origin at (west, south)
+    located = [el for el in elements if el.get("center")]
+    lonlat = np.array([(west, south), (east, north)]
+                      + [(el["center"]["lon"], el["center"]["lat"]) for el in located],
+                      dtype=np.float64)
+    xs, ys = _project(lonlat[:, 0], lonlat[:, 1], proj_epsg)
+    (minx_m, maxx_m), (miny_m, maxy_m) = xs[:2].tolist(), ys[:2].tolist()
+    world_w = maxx_m - minx_m
+    world_h = maxy_m - miny_m
+    xs = xs[2:] - minx_m
+    ys = ys[2:] - miny_m
 
     if target_buildings is None:
-        target_buildings = min(len(pts), req_limit)
-
-    uniform_pts = _grid_thin_uniform(pts, world_w, world_h, max(1, target_buildings), jitter_frac)
-
-    if backfill and len(uniform_pts) < target_buildings:
-        deficit = target_buildings - len(uniform_pts)
-        for _ in range(deficit):
-            uniform_pts.append((random.random() * world_w, random.random() * world_h, {}))
-
-    obstacles: List[Building] = []
-    max_z = 0.0
-    for cx, cy, tags in uniform_pts:
-        h = _levels_to_height_from_tags(tags, default_height_m, floor_height_m)
-        w = random.uniform(*width_range_m)
-        d = random.uniform(*depth_range_m)
-        obstacles.append(Building(id=str(uuid.uuid4()), center=Vec3(x=cx, y=cy, z=h/2.0), size=Vec3(x=w, y=d, z=h)))
-        max_z = max(max_z, h)
-
-    if fit_to_buildings and obstacles:
-        min_x = min(o.center.x - o.size.x * 0.5 for o in obstacles)
-        max_x = max(o.center.x + o.size.x * 0.5 for o in obstacles)
-        min_y = min(o.center.y - o.size.y * 0.5 for o in obstacles)
-        max_y = max(o.center.y + o.size.y * 0.5 for o in obstacles)
-        max_h = max(o.size.z for o in obstacles)
-        sx, sy = min_x, min_y
-        for o in obstacles:
-            o.center = Vec3(x=o.center.x - sx, y=o.center.y - sy, z=o.center.z)
+        target_buildings = min(len(located), req_limit)
+
+    rng = np.random.default_rng()
+    cx, cy, src = _grid_thin_uniform(xs, ys, world_w, world_h, max(1, target_buildings), jitter_frac, rng)
+
+    # only kept tiles parse their level tags; backfilled buildings get the default height
+    bh = np.full(max(len(src), target_buildings if backfill else 0), default_height_m)
+    bh[:len(src)] = [_levels_to_height_from_tags(located[i].get("tags", {}), default_height_m, floor_height_m)
+                     for i in src.tolist()]
+    if len(bh) > len(src):
+        fill = rng.random((len(bh) - len(src), 2)) * (world_w, world_h)
+        cx = np.concatenate((cx, fill[:, 0]))
+        cy = np.concatenate((cy, fill[:, 1]))
+
+    # footprints are the only per-building randomness left; Buildings are made once the centers are final
+    n = len(bh)
+    bw = rng.uniform(*width_range_m, size=n)
+    bd = rng.uniform(*depth_range_m, size=n)
+
+    max_z = float(bh.max()) if n else 0.0
+
+    if fit_to_buildings and n:
+        min_x = float((cx - bw * 0.5).min())
+        max_x = float((cx + bw * 0.5).max())
+        min_y = float((cy - bd * 0.5).min())
+        max_y = float((cy + bd * 0.5).max())
+        cx = cx - min_x
+        cy = cy - min_y
         world_w = max(0.1, max_x - min_x)
         world_h = max(0.1, max_y - min_y)
-        ceiling = max_h + max(0.0, ceiling_margin_m)
+        ceiling = max_z + max(0.0, ceiling_margin_m)
     else:
         ceiling = max_z + max(0.0, ceiling_margin_m) + 25.0
 
-    return World(size=(world_w, world_h, ceiling), obstacles=obstacles)
+    soa = BuildingSoA(
+        ids=_random_ids(n),
+        centers=np.column_stack((cx, cy, bh * 0.5)).astype(np.float32),
+        sizes=np.column_stack((bw, bd, bh)).astype(np.float32),
+    )
+    return World.from_soa((world_w, world_h, ceiling), soa)
 
 
 
@@ -179,8 +311,11 @@ def world_synthetic_city(
     # random
     seed: int | None = None,
 ) -> World:
-    if seed is not None:
-        random.seed(seed)
+    # private generator: seeded runs are reproducible and don't reseed the global one.
+    # uniform(a, b) is spelled out inline as a + (b - a) * rand() (exactly what
+    # Random.uniform computes) to skip a Python-level call per draw.
+    rng = random.Random(seed)
+    rand, randint = rng.random, rng.randint
 
     def tiling(total: float, block: float, road: float) -> Tuple[int, float]:
         pair = road + block
@@ -198,8 +333,9 @@ def world_synthetic_city(
     origin_x = margin_x * 0.5
     origin_y = margin_y * 0.5
 
-    obstacles: List[Building] = []
-    max_z = 0.0
+    # (cx, cy, w, d, h) per placed building, preallocated at the most a city can hold
+    boxes: List[Tuple[float, float, float, float, float] | None] = [None] * (nx * ny * max(2, buildings_per_block[1]))
+    n_placed = 0
 
     cbd_cx = city_w * cbd_center_frac[0]
     cbd_cy = city_h * cbd_center_frac[1]
@@ -218,7 +354,7 @@ def world_synthetic_city(
             sy0 = origin_y + iy * (street_w + block_h) + street_w
             sy1 = sy0 + block_h
 
-            r = random.random()
+            r = rand()
             if r < park_prob:
                 continue  
 
@@ -229,7 +365,7 @@ def world_synthetic_city(
             if inner_x1 - inner_x0 < min_bldg_w or inner_y1 - inner_y0 < min_bldg_d:
                 continue
 
-            n_b = random.randint(1, 2) if r < park_prob + plaza_prob else random.randint(*buildings_per_block)
+            n_b = randint(1, 2) if r < park_prob + plaza_prob else randint(*buildings_per_block)
 
             avg_w = max(min_bldg_w, (inner_x1 - inner_x0) / max(2, math.sqrt(n_b)) - spacing_m)
             avg_d = max(min_bldg_d, (inner_y1 - inner_y0) / max(2, math.sqrt(n_b)) - spacing_m)
@@ -238,12 +374,12 @@ def world_synthetic_city(
             taken: List[Tuple[float, float, float, float]] = []
             while placed < n_b and attempts < n_b * 20:
                 attempts += 1
-                w = random.uniform(0.8 * avg_w, 1.4 * avg_w)
-                d = random.uniform(0.8 * avg_d, 1.4 * avg_d)
+                w = 0.8 * avg_w + (1.4 * avg_w - 0.8 * avg_w) * rand()
+                d = 0.8 * avg_d + (1.4 * avg_d - 0.8 * avg_d) * rand()
                 if w < min_bldg_w or d < min_bldg_d:
                     continue
-                x0 = random.uniform(inner_x0, max(inner_x0, inner_x1 - w))
-                y0 = random.uniform(inner_y0, max(inner_y0, inner_y1 - d))
+                x0 = inner_x0 + (max(inner_x0, inner_x1 - w) - inner_x0) * rand()
+                y0 = inner_y0 + (max(inner_y0, inner_y1 - d) - inner_y0) * rand()
                 x1 = x0 + w; y1 = y0 + d
 
                 ok = True
@@ -265,19 +401,25 @@ def world_synthetic_city(
                 
                 # Higher chance of super-tall buildings near edges (up to 15% at edges, 0% at center)
                 edge_supertall_prob = 0.15 * (1.0 - min(1.0, edge_dist * 4))
-                is_supertall = random.random() < edge_supertall_prob
+                is_supertall = rand() < edge_supertall_prob
                 
                 if is_supertall:
                     # Create dramatically taller buildings (2-4x normal height)
-                    h *= random.uniform(2.0, 4.0)
+                    h *= 2.0 + (4.0 - 2.0) * rand()
                 else:
                     # Normal buildings get more height variation
-                    h *= random.uniform(0.4, 0.7) if r < park_prob + plaza_prob else random.uniform(0.6, 1.8)
+                    h *= 0.4 + (0.7 - 0.4) * rand() if r < park_prob + plaza_prob else 0.6 + (1.8 - 0.6) * rand()
 
-                obstacles.append(Building(id=str(uuid.uuid4()),
-                                          center=Vec3(x=cx, y=cy, z=h * 0.5),
-                                          size=Vec3(x=bw, y=bd, z=h)))
-                max_z = max(max_z, h)
+                boxes[n_placed] = (cx, cy, bw, bd, h)
+                n_placed += 1
 
+    rows = np.array(boxes[:n_placed]).reshape(-1, 5)
+    max_z = float(rows[:, 4].max()) if n_placed else 0.0
     ceiling = max(60.0, max_z + 10.0)
-    return World(size=(city_w, city_h, ceiling), obstacles=obstacles)
+    rows = rows.astype(np.float32)
+    soa = BuildingSoA(
+        ids=_random_ids(len(rows)),
+        centers=np.column_stack((rows[:, 0], rows[:, 1], rows[:, 4] * 0.5)),
+        sizes=rows[:, 2:5].copy(),
+    )
+    return World.from_soa((city_w, city_h, ceiling), soa)
@@ -5,18 +5,20 @@ from ..models import Drone, Vec3, World
 
 def step_drones(drones: List[Drone], dt: float, speed: float = 30.0) -> None:
     """Move drones toward their next waypoint if any (very simple kinematics)."""
+    max_step = speed * dt
     for d in drones:
-        if not d.path:
+        path = d.path
+        if not path:
             continue
-        target = d.path[0]
-        dx = target.x - d.pos.x
-        dy = target.y - d.pos.y
-        dz = target.z - d.pos.z
+        target = path[0]
+        pos = d.pos
+        dx = target.x - pos.x
+        dy = target.y - pos.y
+        dz = target.z - pos.z
         dist = (dx*dx + dy*dy + dz*dz) ** 0.5
         if dist < 1e-3:
             d.pos = target
-            d.path.pop(0)
+            path.pop(0)
             continue
-        ux, uy, uz = dx/dist, dy/dist, dz/dist
-        step = min(speed * dt, dist)
-        d.pos = Vec3(x=d.pos.x + ux*step, y=d.pos.y + uy*step, z=d.pos.z + uz*step)
\ No newline at end of file
+        step = dist if dist < max_step else max_step
+        d.pos = Vec3(pos.x + dx/dist*step, pos.y + dy/dist*step, pos.z + dz/dist*step)
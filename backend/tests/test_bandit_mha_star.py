@@ -0,0 +1,84 @@
+import numpy as np
+
+from app.models import Building, Vec3, World
+from app.sim.algorithms.bandit_mha_star import (GridCacheBMHA, _astar_core, _descend, _edge_time,
+                                                _NBR_DXY, _NBR_STEP, _speed_from_clearance, _speed_table,
+                                                _time_to_goal)
+
+V_MIN, V_MAX, KAPPA = 4.0, 20.0, 8.0
+
+
+def _walled_grid(n_landmarks):
+    # a wall across the middle forces a detour, so searches run long enough to schedule every arm
+    world = World(size=(600.0, 400.0, 100.0), obstacles=[
+        Building(id="wall", center=Vec3(300.0, 180.0, 20.0), size=Vec3(40.0, 360.0, 40.0)),
+    ])
+    grid = GridCacheBMHA.for_world(world, 20.0, 6.0, n_landmarks)
+    return grid, _speed_table(grid.clearance_m, V_MIN, V_MAX, KAPPA)
+
+
+def _search(grid, v_cell, s, t, anchor_period=6):
+    """One single-goal search with the planner's default weights; (parent, reached, pulls)."""
+    lm_dist = grid.landmark_dist
+    if lm_dist is None:
+        lm_dist = np.empty((0, grid.w * grid.h), dtype=np.float32)
+    return _astar_core(
+        grid.blocked.ravel(), v_cell, grid.w, grid.h, float(grid.cell), s, t,
+        lm_dist, lm_dist[:, t].astype(np.float64), 4, 2, V_MAX, V_MIN, KAPPA,
+        1.15, 1.0, 1.1, 0.2, 0.8, anchor_period, 2500, 1.05, False,
+    )
+
+
+def _chain_time(grid, v_cell, chain):
+    """Travel time along a chain of 4-connected flat cell indices."""
+    v_oob = _speed_from_clearance(0.0, V_MIN, V_MAX, KAPPA)
+    total = 0.0
+    for u, v in zip(chain, chain[1:]):
+        k = next(k for k in range(4) if (_NBR_DXY[k, 1] * grid.w + _NBR_DXY[k, 0]) == v - u)
+        total += _edge_time(v_cell, grid.w, grid.h, u, u % grid.w, u // grid.w, v, v % grid.w, v // grid.w,
+                            _NBR_STEP[k] * grid.cell, 2, v_oob)
+    return total
+
+
+def _pulls(n_landmarks):
+    grid, v_cell = _walled_grid(n_landmarks)
+    s = grid.idx(grid.from_world(50.0, 200.0))
+    t = grid.idx(grid.from_world(550.0, 200.0))
+    parent, reached, pulls = _search(grid, v_cell, s, t)
+    assert reached and parent[t] >= 0
+    return pulls
+
+
+def test_hint_arms_expand_nodes():
+    pulls = _pulls(4)
+    assert pulls[0] > 0
+    assert (pulls[1:] > 0).all(), pulls
+
+
+def test_landmark_arm_idle_without_landmarks():
+    pulls = _pulls(0)
+    assert pulls[2] == 0
+    assert pulls[1] > 0 and pulls[3] > 0, pulls
+
+
+def test_shared_goal_descent_matches_single_goal_search():
+    grid, v_cell = _walled_grid(0)
+    blocked = grid.blocked.ravel()
+    t = grid.idx(grid.from_world(550.0, 200.0))
+    sources = [grid.idx(grid.from_world(x, y)) for x, y in ((50.0, 200.0), (30.0, 30.0), (250.0, 390.0), (450.0, 60.0))]
+    v_oob = _speed_from_clearance(0.0, V_MIN, V_MAX, KAPPA)
+    dist = _time_to_goal(blocked, v_cell, grid.w, grid.h, float(grid.cell), t,
+                         np.asarray(sources, dtype=np.int64), 4, 2, v_oob)
+    for s in sources:
+        chain = _descend(dist, blocked, v_cell, grid.w, grid.h, float(grid.cell), s, t, 4, 2, v_oob).tolist()
+        assert chain[0] == s and chain[-1] == t
+        assert not blocked[chain].any()
+        assert abs(_chain_time(grid, v_cell, chain) - dist[s]) < 1e-6
+
+        # anchor-only A* is optimal for the same edge costs
+        parent, reached, _ = _search(grid, v_cell, s, t, anchor_period=1)
+        assert reached
+        ref = [t]
+        while ref[-1] != s:
+            ref.append(int(parent[ref[-1]]))
+        assert abs(_chain_time(grid, v_cell, ref[::-1]) - dist[s]) < 1e-6
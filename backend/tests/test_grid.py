@@ -0,0 +1,53 @@
+import random
+
+import numpy as np
+
+from app.models import Building, Vec3, World
+from app.sim.algorithms.bandit_mha_star import GridCacheBMHA
+
+
+def _overlap_reference(world, cell, inflate, w_cells, h_cells):
+    """Per-cell positive-area overlap test: the rasterizer's original definition of 'blocked'."""
+    blocked = np.zeros((h_cells, w_cells), dtype=np.uint8)
+    for (cx, cy, _), (sx, sy, _) in zip(world.obs_centers.tolist(), world.obs_sizes.tolist()):
+        rx0, rx1 = cx - sx * 0.5 - inflate, cx + sx * 0.5 + inflate
+        ry0, ry1 = cy - sy * 0.5 - inflate, cy + sy * 0.5 + inflate
+        for gy in range(h_cells):
+            for gx in range(w_cells):
+                if not (rx1 <= gx * cell or rx0 >= (gx + 1) * cell or ry1 <= gy * cell or ry0 >= (gy + 1) * cell):
+                    blocked[gy, gx] = 1
+    return blocked
+
+
+def test_rasterization_matches_overlap_test():
+    rng = random.Random(3)
+    cell = 10.0
+    for trial in range(40):
+        obstacles = []
+        for i in range(rng.randint(1, 12)):
+            if i % 3 == 0:
+                # edges exactly on cell boundaries must not spill into the neighbouring cell
+                cx, cy = rng.randint(0, 30) * cell, rng.randint(0, 20) * cell
+                sx, sy = 2 * rng.randint(1, 4) * cell, 2 * rng.randint(1, 4) * cell
+            else:
+                cx, cy = rng.uniform(-20.0, 320.0), rng.uniform(-20.0, 220.0)
+                sx, sy = rng.uniform(1.0, 60.0), rng.uniform(1.0, 60.0)
+            obstacles.append(Building(id=str(i), center=Vec3(cx, cy, 10.0), size=Vec3(sx, sy, 20.0)))
+        world = World(size=(300.0, 200.0, 100.0), obstacles=obstacles)
+        inflate = rng.choice((0.0, 3.0, 5.0))
+        grid = GridCacheBMHA.build(world, cell, inflate)
+        expected = _overlap_reference(world, cell, inflate, grid.w, grid.h)
+        assert np.array_equal(grid.blocked, expected), trial
+
+
+def test_clearance_and_nearest_free():
+    world = World(size=(100.0, 100.0, 50.0), obstacles=[
+        Building(id="b", center=Vec3(50.0, 50.0, 10.0), size=Vec3(20.0, 20.0, 20.0)),
+    ])
+    grid = GridCacheBMHA.build(world, 10.0, 0.0)
+    clearance = grid.clearance_m.reshape(grid.h, grid.w)
+    assert grid.blocked[4:6, 4:6].all() and grid.blocked.sum() == 4
+    assert clearance[5, 5] == 0.0
+    assert clearance[5, 7] == 20.0
+    g = grid.nearest_free((4, 4))
+    assert not grid.is_blocked(g) and max(abs(g[0] - 4), abs(g[1] - 4)) == 1
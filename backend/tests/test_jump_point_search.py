@@ -0,0 +1,76 @@
+import heapq
+import math
+import random
+
+import numpy as np
+
+from app.models import World
+from app.sim.algorithms.bandit_mha_star import GridCacheBMHA
+from app.sim.algorithms.jump_point_search import JumpPointSearch
+
+CELL = 10.0
+
+
+def _brute_force(grid, S, T):
+    """Dijkstra over the 8-connected grid without corner cutting; path length in meters or None."""
+    dist = {S: 0.0}
+    pq = [(0.0, S)]
+    done = set()
+    while pq:
+        d, u = heapq.heappop(pq)
+        if u in done:
+            continue
+        done.add(u)
+        if u == T:
+            return d
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if not dx and not dy:
+                    continue
+                v = (u[0] + dx, u[1] + dy)
+                if grid.is_blocked(v):
+                    continue
+                if dx and dy and (grid.is_blocked((u[0] + dx, u[1])) or grid.is_blocked((u[0], u[1] + dy))):
+                    continue
+                nd = d + (math.sqrt(2.0) if dx and dy else 1.0) * grid.cell
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    heapq.heappush(pq, (nd, v))
+    return None
+
+
+def _random_grid(rng, trial):
+    W, H = rng.randint(5, 40), rng.randint(5, 40)
+    grid = GridCacheBMHA.build(World(size=(W * CELL, H * CELL, 50.0), obstacles=[]), CELL, 0.0)
+    grid.blocked = (np.random.default_rng(trial).random((H, W)) < rng.random() * 0.4).astype(np.uint8)
+    return grid
+
+
+def test_paths_match_brute_force_search():
+    rng = random.Random(5)
+    checked = 0
+    for trial in range(300):
+        grid = _random_grid(rng, trial)
+        S = (rng.randrange(grid.w), rng.randrange(grid.h))
+        T = (rng.randrange(grid.w), rng.randrange(grid.h))
+        if grid.is_blocked(S) or grid.is_blocked(T):
+            continue
+        algo = JumpPointSearch()
+        algo._grid, algo._blocked_u8 = grid, grid.blocked.ravel()
+        path = algo._plan_one(grid.to_world(S, 0.0), grid.to_world(T, 0.0), 0.0)
+
+        expected = _brute_force(grid, S, T)
+        if expected is None:
+            assert len(path) == 1, trial
+            continue
+        cells = [grid.from_world(p.x, p.y) for p in path]
+        assert cells[0] == S and cells[-1] == T, trial
+        assert not any(grid.is_blocked(c) for c in cells), trial
+        for a, b in zip(cells, cells[1:]):
+            assert max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1, trial
+            if a[0] != b[0] and a[1] != b[1]:
+                assert not grid.is_blocked((b[0], a[1])) and not grid.is_blocked((a[0], b[1])), trial
+        length = sum(math.hypot(a.x - b.x, a.y - b.y) for a, b in zip(path, path[1:]))
+        assert abs(length - expected) < 1e-6, trial
+        checked += 1
+    assert checked > 100
@@ -0,0 +1,43 @@
+from app.models import Drone, Vec3
+from app.sim.algorithms.base import ReplanSchedule
+
+
+def _drone(i, target=(100.0, 100.0), path=()):
+    return Drone(id=f"d{i}", pos=Vec3(0.0, 0.0), target=Vec3(*target) if target else None, path=list(path))
+
+
+def test_new_drones_with_targets_are_due():
+    sched = ReplanSchedule(every=20)
+    drones = [_drone(0), _drone(1, target=None), _drone(2)]
+    assert sched.due(drones, tick=0) == [0, 2]
+
+
+def test_marked_drones_wait_for_the_period():
+    sched = ReplanSchedule(every=20)
+    drones = [_drone(0, path=[Vec3(1.0, 1.0)]), _drone(1, path=[Vec3(1.0, 1.0)])]
+    for i in sched.due(drones, tick=5):
+        sched.mark(drones[i], 5)
+    assert sched.due(drones, tick=6) == []
+    assert sched.due(drones, tick=24) == []
+    assert sched.due(drones, tick=25) == [0, 1]
+
+
+def test_goal_change_or_empty_path_forces_replan():
+    sched = ReplanSchedule(every=20)
+    drones = [_drone(0, path=[Vec3(1.0, 1.0)]), _drone(1, path=[Vec3(1.0, 1.0)])]
+    for d in drones:
+        sched.due([d], tick=0)
+        sched.mark(d, 0)
+    drones[0].target = Vec3(200.0, 50.0)
+    drones[1].path.clear()
+    assert sched.due(drones, tick=1) == [0, 1]
+
+
+def test_slots_follow_ids_not_positions():
+    sched = ReplanSchedule(every=20)
+    a, b = _drone(0, path=[Vec3(1.0, 1.0)]), _drone(1, path=[Vec3(1.0, 1.0)])
+    sched.due([a, b], tick=0)
+    sched.mark(a, 0)
+    # reordered and grown past the initial capacity: only b and the newcomers are due
+    more = [_drone(i) for i in range(2, 10)]
+    assert sched.due([b, a] + more, tick=1) == [0] + list(range(2, 10))
@@ -1,11 +1,26 @@
 import { useSimStore } from "../state/simStore";
-import type { ErrorMsg, MetaMsg, OutMsg, StateMsg } from "../types";
+import type { Drone, ErrorMsg, MetaMsg, OutMsg, StateMsg } from "../types";
 
 let ws: WebSocket | null = null;
 let queue: OutMsg[] = [];
+const decoder = new TextDecoder();
+
+function decodeDrones(m: StateMsg): Drone[] {
+  const k = m.scale;
+  return m.ids.map((id, i) => {
+    const j = 3 * i;
+    return {
+      id,
+      pos: { x: m.pos[j] * k, y: m.pos[j + 1] * k, z: m.pos[j + 2] * k },
+      vel: { x: m.vel[j] * k, y: m.vel[j + 1] * k, z: m.vel[j + 2] * k },
+    };
+  });
+}
+
 export function connectWs() {
   const url = import.meta.env.VITE_WS_URL ?? "ws://localhost:8000/ws";
   ws = new WebSocket(url);
+  ws.binaryType = "arraybuffer";
 
   ws.onopen  = ()=> {
     useSimStore.getState().setConnected(true);
@@ -16,14 +31,14 @@ export function connectWs() {
   ws.onerror = (e)=> console.error("WebSocket error:", e);
 
   ws.onmessage = (ev) => {
-    const msg = JSON.parse(ev.data) as MetaMsg | StateMsg | ErrorMsg;
+    const text = typeof ev.data === "string" ? ev.data : decoder.decode(ev.data as ArrayBuffer);
+    const msg = JSON.parse(text) as MetaMsg | StateMsg | ErrorMsg;
     if (msg.type === "meta") {
       useSimStore.getState().setAlgorithms(msg.algorithms);
       useSimStore.getState().setWorld(msg.world);
       useSimStore.getState().setWorldPresets(msg.worlds ?? []);
     } else if (msg.type === "state") {
-      useSimStore.getState().setStateFrame(msg.tick, msg.drones);
-      console.log(msg)
+      useSimStore.getState().setStateFrame(msg.tick, decodeDrones(msg));
     } else if (msg.type === "error") {
       console.error("Server error:", msg.message);
     }
@@ -4,7 +4,9 @@ export type World = { size:[number,number,number]; obstacles:Building[] };
 
 export type Drone = { id:string; pos:Vec3; vel:Vec3; path?:Vec3[]; target?:Vec3|null };
 
-export type StateMsg = { type:"state"; tick:number; drones:Drone[]; done:boolean };
+// pos/vel are flat [x,y,z, x,y,z, ...] int16 steps; multiply by scale for meters.
+// Under load the server drops stale frames, so ticks may skip.
+export type StateMsg = { type:"state"; tick:number; scale:number; ids:string[]; pos:number[]; vel:number[] };
 export type MetaMsg  = { type:"meta"; algorithms:string[]; world:World; worlds:string[] };
 export type ErrorMsg = { type:"error"; message:string };
 